@@ -0,0 +1,122 @@
+"""Measure request overhead through a 5-layer ASGI middleware stack.
+
+Requests go through either the ASGI 3 interface (`app(scope, receive, send)`)
+or the legacy ASGI 2 interface (`app(scope)(receive, send)`), and through a
+stack of either ASGI 3 or legacy ASGI 2 middleware.
+
+Both latency and memory allocated per request (peak, as traced by
+`tracemalloc`) are reported.
+
+Usage: python -m benchmarks.asgi
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from bocadillo import App, ASGIMiddleware
+
+LAYERS = 5
+NUMBER = 2000
+REPEAT = 5
+TRACED = 200
+
+
+class Middleware(ASGIMiddleware):
+    pass
+
+
+class LegacyMiddleware:
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __call__(self, scope):
+        return self.inner(scope)
+
+
+def build_app(middleware_cls) -> App:
+    app = App(static_dir=None)
+
+    @app.route("/")
+    async def index(req, res):
+        res.text = "OK"
+
+    for _ in range(LAYERS):
+        app.add_asgi_middleware(middleware_cls)
+
+    return app
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def get_scope() -> dict:
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 8000),
+        "server": ("testserver", 80),
+    }
+
+
+async def call_asgi2(app: App):
+    await app(get_scope())(receive, send)
+
+
+async def call_asgi3(app: App):
+    await app(get_scope(), receive, send)
+
+
+async def measure(app: App, call) -> tuple:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(NUMBER):
+            await call(app)
+        best = min(best, (time.perf_counter() - start) / NUMBER)
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(TRACED):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await call(app)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    return best, min(peaks)
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    stacks = {"asgi3": Middleware, "legacy": LegacyMiddleware}
+    calls = {"asgi2": call_asgi2, "asgi3": call_asgi3}
+    for stack, middleware_cls in stacks.items():
+        for interface, call in calls.items():
+            app = build_app(middleware_cls)
+            try:
+                seconds, peak = loop.run_until_complete(measure(app, call))
+            except TypeError:  # Interface not supported.
+                continue
+            print(
+                f"{stack:>6} middleware, {interface} call "
+                f"{seconds * 1e6:>8.2f} µs/request "
+                f"{peak:>8} B/request"
+            )
+
+
+if __name__ == "__main__":
+    main()
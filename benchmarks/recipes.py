@@ -0,0 +1,81 @@
+"""Compare request latency for top-level routes and routes of recipes.
+
+Recipes are grouped in a 3-level recipe book, i.e. routes are served under
+`/level1/level2/items/`, and either mounted or flattened.
+
+Usage: python -m benchmarks.recipes
+"""
+
+import asyncio
+import time
+
+from bocadillo import App, Recipe
+
+NUMBER = 2000
+REPEAT = 5
+
+
+def build_app(mode: str) -> App:
+    app = App(static_dir=None)
+
+    @app.route("/items/{pk}")
+    async def top_level(req, res, pk):
+        res.text = pk
+
+    items = Recipe("items", static_dir=None)
+
+    @items.route("/{pk}")
+    async def retrieve(req, res, pk):
+        res.text = pk
+
+    book = Recipe.book(Recipe.book(items, prefix="/level2"), prefix="/level1")
+    if mode != "top-level":
+        app.recipe(book, flatten=mode == "flattened")
+
+    return app
+
+
+async def measure(app: App, path: str) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def get_scope() -> dict:
+        return {
+            "type": "http",
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 8000),
+            "server": ("testserver", 80),
+        }
+
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(NUMBER):
+            await app(get_scope())(receive, send)
+        best = min(best, (time.perf_counter() - start) / NUMBER)
+    return best
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    cases = {
+        "top-level": "/items/42",
+        "mounted": "/level1/level2/items/42",
+        "flattened": "/level1/level2/items/42",
+    }
+    for mode, path in cases.items():
+        seconds = loop.run_until_complete(measure(build_app(mode), path))
+        print(f"{mode:>10} {seconds * 1e6:>10.2f} µs/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare route matchers for an increasing number of routes.
+
+Usage: python -m benchmarks.routing
+"""
+
+import timeit
+
+from bocadillo.matchers import RegexMatcher, ScanMatcher, TreeMatcher
+from bocadillo.routing import HTTPRoute
+
+SIZES = (10, 100, 1000)
+MATCHERS = (ScanMatcher, RegexMatcher, TreeMatcher)
+NUMBER = 2000
+
+
+async def view(req, res):
+    pass
+
+
+def build_routes(size: int) -> list:
+    # A mix of static and parametrized routes, one resource per route.
+    routes = []
+    for index in range(size):
+        if index % 2:
+            pattern = f"/api/resource{index}/{{pk}}"
+        else:
+            pattern = f"/api/resource{index}"
+        routes.append(HTTPRoute.create(view, pattern=pattern, name=str(index)))
+    return routes
+
+
+def get_paths(size: int) -> dict:
+    return {
+        "first": "/api/resource0",
+        "last": f"/api/resource{size - 1}/42",
+        "miss": "/not/found",
+    }
+
+
+def main():
+    header = f"{'routes':>7} {'path':>6}"
+    for matcher_class in MATCHERS:
+        header += f" {matcher_class.__name__ + ' (µs)':>18}"
+    print(header)
+
+    for size in SIZES:
+        routes = build_routes(size)
+        matchers = [matcher_class(routes) for matcher_class in MATCHERS]
+
+        for label, path in get_paths(size).items():
+            line = f"{size:>7} {label:>6}"
+            for matcher in matchers:
+                seconds = timeit.timeit(
+                    lambda: matcher.match(path), number=NUMBER
+                )
+                line += f" {seconds / NUMBER * 1e6:>18.2f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,11 @@ class ASGIApp:
         raise NotImplementedError
 
 
+class ASGI3App:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        raise NotImplementedError
+
+
 # HTTP
 AsyncHandler = Callable[[Request, Response, Any], Awaitable[None]]
 SyncHandler = Callable[[Request, Response, Any], None]
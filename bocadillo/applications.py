@@ -6,8 +6,10 @@ from functools import partial
 from typing import (
     TYPE_CHECKING,
     Any,
+    Awaitable,
     Callable,
     Dict,
+    Iterable,
     List,
     Optional,
     Tuple,
@@ -19,13 +21,14 @@ from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.wsgi import WSGIResponder
+from starlette.middleware.wsgi import WSGIResponder as _WSGIResponder
 from starlette.routing import Lifespan
 from uvicorn.main import run
 import typesystem
 
 from .app_types import (
     _E,
+    ASGI3App,
     ASGIApp,
     ASGIAppInstance,
     ErrorHandler,
@@ -34,18 +37,31 @@ from .app_types import (
     Scope,
     Send,
 )
-from .compat import WSGIApp, nullcontext
+from .asgi import (
+    ASGI3Adapter,
+    ScopedASGIApp,
+    asgi3,
+    is_asgi3_middleware,
+    scope_filter,
+    to_asgi2,
+    to_asgi3,
+)
+from .compat import WSGIApp
 from .constants import CONTENT_TYPE, DEFAULT_CORS_CONFIG
 from .converters import on_validation_error
 from .error_handlers import error_to_text
 from .errors import HTTPError, HTTPErrorMiddleware, ServerErrorMiddleware
+from .executors import Executor, ProcessPool, WSGIResponder
 from .injection import _STORE
+from .matchers import RouteMatcher
 from .media import UnsupportedMediaType, get_default_handlers
 from .meta import DocsMeta
-from .middleware import ASGIMiddleware
+from .middleware import ASGIMiddleware, compile_middleware
+from .mounts import APP, ASGI, WSGI, Mount, MountIndex
 from .request import Request
 from .response import Response
-from .routing import RoutingMixin
+from .reverse import URLFormat, bump_version, get_version
+from .routing import HTTPRoute, RoutingMixin, route_filter
 from .sessions import MissingSecretKey
 from .staticfiles import WhiteNoise, static
 
@@ -67,6 +83,9 @@ class App(RoutingMixin, metaclass=DocsMeta):
     """The all-mighty application class.
 
     This class implements the [ASGI](https://asgi.readthedocs.io) protocol.
+    It is an ASGI 3 app, i.e. `await app(scope, receive, send)`, and can also
+    be called as a legacy ASGI 2 app, i.e. `await app(scope)(receive, send)`,
+    for servers and test clients that only support ASGI 2.
 
     [CORSMiddleware]: https://www.starlette.io/middleware/#corsmiddleware
     [SessionMiddleware]: https://www.starlette.io/middleware/#sessionmiddleware
@@ -92,6 +111,9 @@ class App(RoutingMixin, metaclass=DocsMeta):
     static_config (dict):
         Extra static files configuration attributes.
         See also #::bocadillo.staticfiles#static.
+    static_executor (str):
+        The name of the executor that serves static files.
+        Defaults to `None`, i.e. Starlette's thread pool.
     allowed_hosts (list of str, optional):
         A list of hosts which the server is allowed to run at.
         If the list contains `"*"`, any host is allowed.
@@ -131,25 +153,54 @@ class App(RoutingMixin, metaclass=DocsMeta):
         Can be one of the supported media types.
         Defaults to `"application/json"`.
         See also [Media](../guides/http/media.md).
+    matcher_class (type):
+        The strategy used by routers to look up routes, i.e. a subclass of
+        #::bocadillo.matchers#RouteMatcher.
+        Defaults to #::bocadillo.matchers#TreeMatcher.
+    route_cache_size (int):
+        If given, routers remember the result of this many distinct URL paths
+        (including paths that did not match any route) in a
+        #::bocadillo.routing#RouteCache.
+        Defaults to `None` (disabled).
+    executors (dict):
+        Named thread pools that synchronous views and WSGI apps (including
+        static files) can be assigned to, e.g.
+        `{"reports": {"max_workers": 4, "queue_size": 16}}`.
+        See #::bocadillo.executors#Executor for available parameters.
+    process_pool (dict):
+        If given, a pool of processes for running CPU-bound functions is
+        created with these parameters, e.g. `{"max_workers": 2}`.
+        See #::bocadillo.executors#ProcessPool for available parameters.
 
     # Attributes
     media_handlers (dict):
         The dictionary of media handlers.
         You can access, edit or replace this at will.
+    executors (dict):
+        Maps names to #::bocadillo.executors#Executor objects.
+    process_pool:
+        The app's #::bocadillo.executors#ProcessPool, if configured.
+        It is started and stopped along with the application.
     """
 
     __slots__ = (
         "name",
         "asgi",
-        "_prefix_to_app",
+        "_mounts",
         "_name_to_prefix_and_app",
+        "_url_index",
+        "_url_index_version",
         "_static_apps",
+        "executors",
+        "process_pool",
         "media_handlers",
         "_media_type",
         "exception_middleware",
         "server_error_middleware",
+        "_http_middleware",
         "_lifespan",
         "_store",
+        "_providers_frozen",
         "_frozen",
     )
 
@@ -160,6 +211,7 @@ class App(RoutingMixin, metaclass=DocsMeta):
         static_dir: Optional[str] = "static",
         static_root: Optional[str] = "static",
         static_config: dict = None,
+        static_executor: str = None,
         allowed_hosts: List[str] = None,
         enable_sessions: bool = False,
         sessions_config: dict = None,
@@ -169,25 +221,51 @@ class App(RoutingMixin, metaclass=DocsMeta):
         enable_gzip: bool = False,
         gzip_min_size: int = 1024,
         media_type: str = CONTENT_TYPE.JSON,
+        matcher_class: Type[RouteMatcher] = None,
+        route_cache_size: int = None,
+        executors: Dict[str, dict] = None,
+        process_pool: dict = None,
         **kwargs,
     ):
-        super().__init__(**kwargs)
+        super().__init__(
+            matcher_class=matcher_class,
+            route_cache_size=route_cache_size,
+            **kwargs,
+        )
 
         self.name = name
+        self._providers_frozen = False
+        self._frozen = False
 
         # Base ASGI app
         self.asgi = self.dispatch
 
         # Mounted (children) apps
-        self._prefix_to_app: Dict[str, Any] = {}
+        self._mounts = MountIndex()
         self._name_to_prefix_and_app: Dict[str, Tuple[str, App]] = {}
+        # Reverse URL index, rebuilt when the routing configuration changes.
+        self._url_index: Optional[Dict[str, URLFormat]] = None
+        self._url_index_version = -1
         self._static_apps: Dict[str, WhiteNoise] = {}
 
+        # Executors
+        self.executors: Dict[str, Executor] = {
+            name: Executor(name, **config)
+            for name, config in (executors or {}).items()
+        }
+        self.process_pool: Optional[ProcessPool] = (
+            ProcessPool(**process_pool) if process_pool is not None else None
+        )
+
         # Static files
         if static_dir is not None:
             if static_root is None:
                 static_root = static_dir
-            self.mount(static_root, static(static_dir, **(static_config or {})))
+            self.mount(
+                static_root,
+                static(static_dir, **(static_config or {})),
+                executor=static_executor,
+            )
 
         # Media
         self.media_handlers = get_default_handlers()
@@ -199,6 +277,8 @@ class App(RoutingMixin, metaclass=DocsMeta):
         self.server_error_middleware = ServerErrorMiddleware(
             self.exception_middleware, handler=error_to_text
         )
+        # `(middleware_cls, kwargs)` tuples, in registration order.
+        self._http_middleware: List[Tuple[type, dict]] = []
         self.add_error_handler(HTTPError, error_to_text)
         self.add_error_handler(typesystem.ValidationError, on_validation_error)
 
@@ -207,11 +287,11 @@ class App(RoutingMixin, metaclass=DocsMeta):
 
         # ASGI middleware
 
-        if allowed_hosts is None:
-            allowed_hosts = ["*"]
-        self.add_asgi_middleware(
-            TrustedHostMiddleware, allowed_hosts=allowed_hosts
-        )
+        # NOTE: any host is allowed by default, which requires no checks.
+        if allowed_hosts is not None and "*" not in allowed_hosts:
+            self.add_asgi_middleware(
+                TrustedHostMiddleware, allowed_hosts=allowed_hosts
+            )
 
         if enable_sessions:
             sessions_config = sessions_config or {}
@@ -259,16 +339,91 @@ class App(RoutingMixin, metaclass=DocsMeta):
         # so that further declared views correctly resolve providers.
         self._store.discover_default()
 
+        self.on("startup", self.freeze)
         self.on("startup", self._store.enter_session)
         self.on("shutdown", self._store.exit_session)
+        if self.process_pool is not None:
+            self.on("startup", self.process_pool.start)
+        self.on("shutdown", self.shutdown_executors)
 
-        self._frozen = False
-
-    def _app_providers(self):  # pylint: disable=method-hidden
-        if not self._frozen:
+    def _freeze_providers(self):
+        if not self._providers_frozen:
             self._store.freeze()
-            self._frozen = True
-        return nullcontext()
+            self._providers_frozen = True
+
+    @property
+    def frozen(self) -> bool:
+        """Whether the application has been [frozen](#freeze)."""
+        return self._frozen
+
+    def freeze(self):
+        """Compile routing structures and prevent further changes.
+
+        This is called automatically when the application starts up, i.e.
+        before `startup` event handlers run, so that the cost of building
+        dispatch structures is paid once instead of on the first requests.
+        Mounted Bocadillo apps (e.g. recipes) are frozen too.
+
+        Once frozen, registering routes, mounting apps, adding error handlers
+        or middleware raises a `RuntimeError`.
+
+        Calling this method on a frozen application has no effect.
+        """
+        if self._frozen:
+            return
+
+        self._freeze_providers()
+        self.http_router.freeze()
+        self.websocket_router.freeze()
+        self.exception_middleware.app = compile_middleware(
+            self.exception_middleware.app
+        )
+
+        for mount in self._mounts:
+            if mount.kind == APP:
+                mount.app.freeze()
+
+        self._get_url_index()
+        self._frozen = True
+
+    def get_executor(self, executor: Union[str, Executor]) -> Executor:
+        """Return one of the application's executors.
+
+        # Parameters
+        executor (str or Executor):
+            the name of an executor. Executor objects are returned as-is.
+
+        # Raises
+        LookupError: if no executor exists for this name.
+        """
+        if isinstance(executor, Executor):
+            return executor
+        try:
+            return self.executors[executor]
+        except KeyError:
+            raise LookupError(f"no executor named '{executor}'") from None
+
+    def shutdown_executors(self):
+        """Stop executors and the process pool, including those of mounted
+        apps.
+
+        This is called automatically when the application shuts down.
+        """
+        for executor in self.executors.values():
+            executor.shutdown(wait=False)
+
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+
+        for mount in self._mounts:
+            if mount.kind == APP:
+                mount.app.shutdown_executors()
+
+    def _check_not_frozen(self, action: str):
+        if self._frozen:
+            raise RuntimeError(
+                f"cannot {action}: the application has already started"
+            )
 
     @property
     def media_type(self) -> str:
@@ -282,39 +437,109 @@ class App(RoutingMixin, metaclass=DocsMeta):
         self._media_type = media_type
 
     def url_for(self, name: str, **kwargs) -> str:
-        # Implement route name lookup accross sub-apps.
-        try:
-            return super().url_for(name, **kwargs)
-        except HTTPError as exc:
-            app_name, _, name = name.partition(":")
+        """Build the full URL path for a named #::bocadillo.routing#HTTPRoute.
 
-            if not name:
-                # No app name given.
-                raise exc from None
+        Routes of named sub-apps can be referenced as `"app_name:name"`.
+
+        # Parameters
+        name (str): the name of the route.
+        kwargs (dict): route parameters.
+
+        # Returns
+        url (str): an URL path.
+
+        # Raises
+        HTTPError(404) : if no route exists for the given `name`.
+        TypeError: if route parameters are missing.
+        """
+        return self.url_format_for(name).format(**kwargs)
 
-            return self._url_for_app(app_name, name, **kwargs)
+    def urls_for(self, name: str, params: Iterable[dict]) -> List[str]:
+        """Build URL paths for the same route with different parameters.
 
-    def _url_for_app(self, app_name: str, name: str, **kwargs) -> str:
-        if app_name == self.name:
+        # Example
+
+        ```python
+        >>> app.urls_for("item", [{"pk": 1}, {"pk": 2}])
+        ['/items/1', '/items/2']
+        ```
+
+        # Parameters
+        name (str): the name of the route.
+        params (iterable of dicts): route parameters for each URL path.
+
+        # Returns
+        urls (list of str): URL paths, in the order of `params`.
+
+        # See Also
+        - [url_for](#url-for)
+        """
+        url_format = self.url_format_for(name)
+        return [url_format.format(**kwargs) for kwargs in params]
+
+    def url_format_for(self, name: str) -> URLFormat:
+        """Return the #::bocadillo.reverse#URLFormat of a named route.
+
+        # Raises
+        HTTPError(404) : if no route exists for the given `name`.
+        """
+        url_format = self._get_url_index().get(name)
+        if url_format is None:
+            raise HTTPError(404)
+        return url_format
+
+    def _get_url_index(self) -> Dict[str, URLFormat]:
+        index = self._url_index
+        if index is None or self._url_index_version != get_version():
+            index = self._build_url_index()
+        return index
+
+    def _build_url_index(self) -> Dict[str, URLFormat]:
+        # Map the fully qualified name of all routes, including those of named
+        # sub-apps, to an URL formatter.
+        version = get_version()
+        index: Dict[str, URLFormat] = {}
+
+        for app_name, (prefix, app) in self._name_to_prefix_and_app.items():
+            for name, url_format in app._get_url_index().items():
+                index[f"{app_name}:{name}"] = url_format.with_prefix(prefix)
+
+        routes = self.http_router.routes
+
+        if self.name is not None:
             # NOTE: this allows to reference this app's routes in
             # both with or without the namespace.
-            return self._get_own_url_for(name, **kwargs)
+            prefix = self._get_own_prefix()
+            for name, route in routes.items():
+                index[f"{self.name}:{name}"] = route.url_format.with_prefix(
+                    prefix
+                )
 
-        try:
-            prefix, app = self._name_to_prefix_and_app[app_name]
-        except KeyError as key_exc:
-            raise HTTPError(404) from key_exc
-        else:
-            return prefix + app.url_for(name, **kwargs)
+        for name, route in routes.items():
+            index[name] = route.url_format
+
+        self._url_index = index
+        self._url_index_version = version
+        return index
 
-    def _get_own_url_for(self, name: str, **kwargs) -> str:
+    def _get_own_prefix(self) -> str:
         # NOTE: recipes hook into this method to prepend their
-        # prefix to the URL.
-        return super().url_for(name, **kwargs)
+        # prefix to URLs built with the recipe's name.
+        return ""
 
-    def mount(self, prefix: str, app: Union["App", ASGIApp, WSGIApp]):
+    def mount(
+        self,
+        prefix: str,
+        app: Union["App", ASGI3App, ASGIApp, WSGIApp],
+        kind: str = None,
+        executor: Union[str, Executor] = None,
+    ):
         """Mount another WSGI or ASGI app at the given prefix.
 
+        Requests are dispatched to the app mounted at the longest matching
+        prefix. Prefixes match on path segment boundaries, e.g. an app mounted
+        at `/api` does not receive requests to `/api-v2`.
+
         [WSGI]: https://wsgi.readthedocs.io
         [ASGI]: https://asgi.readthedocs.io
 
@@ -323,30 +548,90 @@ class App(RoutingMixin, metaclass=DocsMeta):
             A path prefix where the app should be mounted, e.g. `"/myapp"`.
         app:
             an object implementing the [WSGI] or [ASGI] protocol.
+        kind (str):
+            either `"asgi"` (ASGI 2), `"asgi3"` or `"wsgi"`. If not given,
+            it is inferred from the signature of `app`. If the signature is
+            ambiguous (e.g. `*args`), the app is probed on its first request
+            instead.
+        executor (str):
+            the name of the executor that a WSGI app is run in.
+            Defaults to `None`, i.e. Starlette's thread pool.
         """
+        self._check_not_frozen("mount an app")
+
         if not prefix.startswith("/"):
             prefix = "/" + prefix
 
-        self._prefix_to_app[prefix] = app
+        if isinstance(app, App):
+            kind = APP
+
+        if executor is not None:
+            executor = self.get_executor(executor)
+
+        self._mounts.add(prefix, app, kind=kind, executor=executor)
+        # NOTE: the mounted app may now shadow some routes.
+        self.http_router.invalidate()
+        self.websocket_router.invalidate()
 
         if isinstance(app, App) and app.name is not None:
             self._name_to_prefix_and_app[app.name] = (prefix, app)
+            bump_version()
 
         if isinstance(app, WhiteNoise):
             self._static_apps[prefix] = app
 
-    def recipe(self, recipe: "Recipe"):
+    def route(
+        self,
+        pattern: str,
+        *,
+        name: str = None,
+        namespace: str = None,
+        executor: Union[str, Executor] = None,
+    ):
+        """Register a new route by decorating a view.
+
+        # Parameters
+        pattern (str): an URL pattern.
+        name (str):
+            an optional name for the route.
+            If a route already exists for this name, it is replaced.
+            Defaults to a snake-cased version of the view's name.
+        namespace (str):
+            an optional namespace for the route. If given, it is prefixed to
+            the name and separated by a colon.
+        executor (str):
+            the name of the executor that synchronous handlers of the view
+            are run in. Defaults to `None`, i.e. Starlette's thread pool.
+        """
+        decorate = super().route(pattern, name=name, namespace=namespace)
+        if executor is None:
+            return decorate
+
+        executor = self.get_executor(executor)
+
+        def decorate_with_executor(view: Any):
+            view = HTTPRoute.normalize(view)
+            view.executor = executor
+            return decorate(view)
+
+        return decorate_with_executor
+
+    def recipe(self, recipe: "Recipe", flatten: bool = False):
         """Apply a recipe.
 
         # Parameters
         recipe:
             a #::bocadillo.recipes#Recipe or #::bocadillo.recipes#RecipeBook
             to be applied to the application.
+        flatten (bool):
+            if `True`, the routes of the recipe are merged into this
+            application's routers instead of mounting the recipe as
+            a sub-application. Defaults to `False`.
 
         # See Also
         - [Recipes](../guides/agnostic/recipes.md)
         """
-        recipe.apply(self)
+        recipe.apply(self, flatten=flatten)
 
     def add_error_handler(self, exception_cls: Type[_E], handler: ErrorHandler):
         """Register a new error handler.
@@ -359,6 +644,7 @@ class App(RoutingMixin, metaclass=DocsMeta):
             `exception_cls` is caught.
             Should accept a request, response and exception parameters.
         """
+        self._check_not_frozen("add an error handler")
         self.exception_middleware.add_exception_handler(exception_cls, handler)
 
     def error_handler(self, exception_cls: Type[Exception]):
@@ -374,31 +660,62 @@ class App(RoutingMixin, metaclass=DocsMeta):
 
         return wrapper
 
-    def add_middleware(self, middleware_cls, **kwargs):
+    def add_middleware(self, middleware_cls, *, only=None, **kwargs):
         """Register a middleware class.
 
         # Parameters
         middleware_cls: a subclass of #::bocadillo.middleware#Middleware.
+        only:
+            if given, the middleware only applies to the routes it selects,
+            and runs after routing. It can be a path prefix (e.g. `"/api"`),
+            a collection of route names, or a predicate that receives an
+            #::bocadillo.routing#HTTPRoute.
+            See #::bocadillo.routing#route_filter.
 
         # See Also
         - [Middleware](../guides/http/middleware.md)
         """
+        self._check_not_frozen("add middleware")
+        if only is not None:
+            self.http_router.add_middleware(
+                partial(middleware_cls, app=self, **kwargs),
+                when=route_filter(only),
+            )
+            return
         self.exception_middleware.app = middleware_cls(
             self.exception_middleware.app, app=self, **kwargs
         )
+        self._http_middleware.append((middleware_cls, kwargs))
 
-    def add_asgi_middleware(self, middleware_cls, **kwargs):
+    def add_asgi_middleware(self, middleware_cls, *, only=None, **kwargs):
         """Register an ASGI middleware class.
 
         # Parameters
         middleware_cls: a class that complies with the ASGI specification.
+            Legacy ASGI 2 middleware, i.e. whose instances only accept
+            `(scope)`, is wrapped so that it fits in the ASGI 3 stack.
+        only:
+            if given, other connections bypass the middleware. It can be
+            a path prefix (e.g. `"/api"`) or a predicate that receives the
+            ASGI scope. See #::bocadillo.asgi#scope_filter.
 
         # See Also
         - [ASGI middleware](../guides/agnostic/asgi-middleware.md)
         - [ASGI](https://asgi.readthedocs.io)
         """
+        self._check_not_frozen("add middleware")
+        when = None if only is None else scope_filter(only)
+        inner = self.asgi
         args = (self,) if issubclass(middleware_cls, ASGIMiddleware) else ()
-        self.asgi = middleware_cls(self.asgi, *args, **kwargs)
+        if is_asgi3_middleware(middleware_cls):
+            middleware = middleware_cls(inner, *args, **kwargs)
+        else:
+            middleware = to_asgi3(
+                middleware_cls(to_asgi2(inner), *args, **kwargs)
+            )
+        if when is not None:
+            middleware = ScopedASGIApp(middleware, inner, when=when)
+        self.asgi = middleware
 
     def on(self, event: str, handler: Optional[EventHandler] = None):
         """Register an event handler.
@@ -435,7 +752,7 @@ class App(RoutingMixin, metaclass=DocsMeta):
         self._lifespan.add_event_handler(event, handler)
         return handler
 
-    async def dispatch_http(self, receive: Receive, send: Send, scope: Scope):
+    async def dispatch_http(self, scope: Scope, receive: Receive, send: Send):
         req = Request(scope, receive)
         res = Response(
             req,
@@ -447,36 +764,72 @@ class App(RoutingMixin, metaclass=DocsMeta):
         await res(receive, send)
         # Re-raise the exception to allow the server to log the error
         # and for the test client to optionally re-raise it too.
-        self.server_error_middleware.raise_if_exception()
+        self.server_error_middleware.raise_if_exception(req)
 
     async def dispatch_websocket(
-        self, receive: Receive, send: Send, scope: Scope
+        self, scope: Scope, receive: Receive, send: Send
     ):
         await self.websocket_router(scope, receive, send)
 
-    def dispatch(self, scope: Scope) -> ASGIAppInstance:
-        with self._app_providers():
-            path: str = scope["path"]
-
-            # Return a sub-mounted extra app, if found
-            for prefix, app in self._prefix_to_app.items():
-                if not path.startswith(prefix):
-                    continue
-                # Remove prefix from path so that the request is made according
-                # to the mounted app's point of view.
-                scope["path"] = path[len(prefix) :]
-                try:
-                    return app(scope)
-                except TypeError:
-                    return WSGIResponder(app, scope)
-
-            if scope["type"] == "websocket":
-                return partial(self.dispatch_websocket, scope=scope)
-
-            assert scope["type"] == "http"
-            return partial(self.dispatch_http, scope=scope)
-
-    def __call__(self, scope: Scope) -> ASGIAppInstance:
+    @staticmethod
+    def _wsgi_responder(mount: Mount, scope: Scope) -> ASGIAppInstance:
+        if mount.executor is None:
+            return _WSGIResponder(mount.app, scope)
+        return WSGIResponder(mount.app, scope, executor=mount.executor)
+
+    def dispatch(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> Awaitable[None]:
+        # NOTE: this returns the awaitable of the app that handles the
+        # request instead of awaiting it, which saves a coroutine per request.
+        if not self._frozen:
+            # NOTE: the app may serve requests without having been started,
+            # e.g. in tests. Providers must be frozen nonetheless.
+            self._freeze_providers()
+
+        path: str = scope["path"]
+
+        # Dispatch to a sub-mounted extra app, if found
+        mount = self._mounts.match(path)
+        if mount is not None:
+            # Remove prefix from path so that the request is made according
+            # to the mounted app's point of view.
+            scope["path"] = path[len(mount.prefix) :]
+            kind = mount.kind
+            if kind == ASGI:
+                return mount.app(scope)(receive, send)
+            if kind == WSGI:
+                return self._wsgi_responder(mount, scope)(receive, send)
+            if kind is not None:
+                # Bocadillo and ASGI 3 apps.
+                return mount.app(scope, receive, send)
+            # Ambiguous signature: probe the app once and remember.
+            try:
+                instance = mount.app(scope)
+            except TypeError:
+                mount.kind = WSGI
+                return self._wsgi_responder(mount, scope)(receive, send)
+            mount.kind = ASGI
+            return instance(receive, send)
+
+        if scope["type"] == "websocket":
+            return self.dispatch_websocket(scope, receive, send)
+
+        assert scope["type"] == "http"
+        return self.dispatch_http(scope, receive, send)
+
+    @asgi3
+    def __call__(
+        self, scope: Scope, receive: Receive = None, send: Send = None
+    ) -> Union[Awaitable[None], ASGIAppInstance]:
         if scope["type"] == "lifespan":
-            return self._lifespan(scope)
-        return self.asgi(scope)
+            instance = self._lifespan(scope)
+            return instance if receive is None else instance(receive, send)
+        asgi = self.asgi
+        if receive is None:
+            # Legacy ASGI 2 call, e.g. from the test client.
+            if isinstance(asgi, ASGI3Adapter):
+                # Outermost middleware is ASGI 2: skip the adapter.
+                return asgi.app(scope)
+            return partial(asgi, scope)
+        return asgi(scope, receive, send)
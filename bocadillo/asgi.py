@@ -0,0 +1,175 @@
+"""Adapters between the ASGI 2 and ASGI 3 interfaces.
+
+Bocadillo apps and middleware implement the ASGI 3 single-callable
+interface, i.e. `async def app(scope, receive, send)`. Legacy ASGI 2 apps,
+i.e. `app(scope)` returning an `async def instance(receive, send)`, are
+wrapped with the adapters below.
+"""
+
+import inspect
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from .app_types import ASGI3App, ASGIApp, ASGIAppInstance, Receive, Scope, Send
+from .urlparse import prefix_matcher
+
+_F = TypeVar("_F", bound=Callable)
+
+_ASGI3_ATTR = "__bocadillo_asgi3__"
+
+
+def asgi3(func: _F) -> _F:
+    """Mark an `__call__()` method as implementing the ASGI 3 interface.
+
+    This is only needed for methods that also accept legacy ASGI 2 calls,
+    i.e. `(scope, receive=None, send=None)`, which cannot be told apart
+    from ASGI 2 methods by their signature.
+    """
+    setattr(func, _ASGI3_ATTR, True)
+    return func
+
+
+def count_required_args(func: Any, bound: bool = True) -> Optional[int]:
+    """Count the required positional arguments of a callable.
+
+    # Parameters
+    func (callable): a function, a class or a callable object.
+    bound (bool):
+        whether `func` is bound. If `False`, the first argument
+        (e.g. `self`) is not counted.
+
+    # Returns
+    count (int):
+        the number of required positional arguments, or `None` if it is
+        ambiguous, e.g. `func` accepts `*args` or cannot be inspected.
+    """
+    try:
+        parameters = list(inspect.signature(func).parameters.values())
+    except (TypeError, ValueError):
+        return None
+
+    if not bound:
+        parameters = parameters[1:]
+
+    if any(param.kind == param.VAR_POSITIONAL for param in parameters):
+        return None
+
+    return sum(
+        1
+        for param in parameters
+        if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD)
+        and param.default is param.empty
+    )
+
+
+def is_asgi3_middleware(middleware_cls: type) -> bool:
+    """Tell whether instances of a middleware class are ASGI 3 apps.
+
+    Classes whose `__call__()` only accepts `(scope)`, or whose signature is
+    ambiguous, are considered ASGI 2 middleware.
+    """
+    call = getattr(middleware_cls, "__call__", None)
+    if getattr(call, _ASGI3_ATTR, False):
+        return True
+    return count_required_args(call, bound=False) == 3
+
+
+class ASGI3Adapter(ASGI3App):
+    """Expose an ASGI 2 app as an ASGI 3 app.
+
+    # Parameters
+    app: an ASGI 2 app.
+    """
+
+    __slots__ = ("app",)
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.app(scope)(receive, send)
+
+
+class ASGI2Adapter(ASGIApp):
+    """Expose an ASGI 3 app as an ASGI 2 app.
+
+    # Parameters
+    app: an ASGI 3 app.
+    """
+
+    __slots__ = ("app",)
+
+    def __init__(self, app: ASGI3App):
+        self.app = app
+
+    def __call__(self, scope: Scope) -> ASGIAppInstance:
+        return partial(self.app, scope)
+
+
+def scope_filter(only: Any) -> Callable[[Scope], bool]:
+    """Build a predicate that selects ASGI connections.
+
+    # Parameters
+    only:
+        either a path prefix (e.g. `"/api"`), which selects connections
+        whose path is located under it, or a callable that receives the
+        ASGI scope and returns whether to select it.
+
+    # Returns
+    when (callable): a scope predicate.
+
+    # Raises
+    TypeError:
+        if `only` is neither a string nor a callable. In particular, ASGI
+        middleware runs before routing, so it cannot be scoped by route name.
+    """
+    if isinstance(only, str):
+        matches = prefix_matcher(only)
+        return lambda scope: matches(scope["path"])
+
+    if callable(only):
+        return only
+
+    raise TypeError(
+        "ASGI middleware can only be scoped by path prefix or predicate, "
+        f"got {only!r}"
+    )
+
+
+class ScopedASGIApp(ASGI3App):
+    """Send some connections through an ASGI app, and others around it.
+
+    # Parameters
+    app: an ASGI 3 app, usually a middleware wrapping `inner`.
+    inner: the ASGI 3 app that receives the other connections.
+    when (callable): a predicate on the ASGI scope.
+    """
+
+    __slots__ = ("app", "inner", "when")
+
+    def __init__(
+        self, app: ASGI3App, inner: ASGI3App, when: Callable[[Scope], bool]
+    ):
+        self.app = app
+        self.inner = inner
+        self.when = when
+
+    def __call__(self, scope: Scope, receive: Receive, send: Send) -> Awaitable:
+        # NOTE: return the awaitable instead of awaiting it, so that
+        # bypassing `app` does not cost an extra coroutine frame.
+        app = self.app if self.when(scope) else self.inner
+        return app(scope, receive, send)
+
+
+def to_asgi3(app: ASGIApp) -> ASGI3App:
+    """Wrap an ASGI 2 app so that it implements the ASGI 3 interface."""
+    if isinstance(app, ASGI2Adapter):
+        return app.app
+    return ASGI3Adapter(app)
+
+
+def to_asgi2(app: ASGI3App) -> ASGIApp:
+    """Wrap an ASGI 3 app so that it implements the ASGI 2 interface."""
+    if isinstance(app, ASGI3Adapter):
+        return app.app
+    return ASGI2Adapter(app)
@@ -1,5 +1,6 @@
 import asyncio
 import re
+import warnings
 from typing import (
     Callable,
     cast,
@@ -28,6 +29,7 @@ _CAMEL_REGEX = re.compile(r"(.)([A-Z][a-z]+)")
 _SNAKE_REGEX = re.compile(r"([a-z0-9])([A-Z])")
 
 _V = TypeVar("_V")
+_F = TypeVar("_F", bound=Callable)
 
 
 class asyncnullcontext:
@@ -41,26 +43,82 @@ class asyncnullcontext:
         pass
 
 
+_INLINE_ATTR = "__bocadillo_inline__"
+
+
+def inline(func: _F) -> _F:
+    """Mark a synchronous function as non-blocking.
+
+    Inline functions are called directly on the event loop by
+    #::bocadillo.compat#call_async instead of being run in the thread pool,
+    which saves a thread hop for trivial functions.
+
+    ::: warning
+    Inline functions block the event loop while they run: they must not
+    perform I/O or any other slow operation.
+    :::
+
+    In [asyncio debug mode](https://docs.python.org/3/library/asyncio-dev.html#debug-mode),
+    a `RuntimeWarning` is issued when an inline function takes longer than
+    the event loop's `slow_callback_duration` (100ms by default).
+    """
+    setattr(func, _INLINE_ATTR, True)
+    return func
+
+
+def is_inline(func: Callable) -> bool:
+    """Return whether a function was marked with #::bocadillo.compat#inline."""
+    return getattr(func, _INLINE_ATTR, False)
+
+
+def _call_inline(func: Callable[..., _V], *args: Any, **kwargs: Any) -> _V:
+    loop = asyncio.get_event_loop()
+    if not loop.get_debug():
+        return func(*args, **kwargs)
+
+    start = loop.time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        duration = loop.time() - start
+        if duration >= loop.slow_callback_duration:
+            name = getattr(func, "__qualname__", repr(func))
+            warnings.warn(
+                f"inline function {name} blocked the event loop for "
+                f"{duration:.3f} seconds",
+                RuntimeWarning,
+            )
+
+
 async def call_async(
     func: Union[Callable[..., _V], Callable[..., Awaitable[_V]]],
     *args: Any,
     sync: Optional[bool] = None,
-    **kwargs: Any
+    executor: Any = None,
+    **kwargs: Any,
 ) -> _V:
     """Call a function in an async manner.
 
     # Parameters
     func:
-        a callable that is either awaited (if a coroutine function)
+        a callable that is either awaited (if a coroutine function),
+        called directly (if marked with #::bocadillo.compat#inline),
         or run in the thread pool (if a regular function).
     sync (bool):
         a hint as to whether `func` is synchronous. If not given, it is
         inferred as `asyncio.iscoroutinefunction(func)`.
+    executor:
+        an optional #::bocadillo.executors#Executor to run `func` in,
+        if it is run in a thread pool. Defaults to Starlette's thread pool.
 
     # See Also
     - [Executing code in thread or process pools](https://docs.python.org/3/library/asyncio-eventloop.html#executing-code-in-thread-or-process-pools)
     """
     if sync or (sync is None and not asyncio.iscoroutinefunction(func)):
+        if is_inline(func):
+            return _call_inline(func, *args, **kwargs)
+        if executor is not None:
+            return await executor.run(func, *args, **kwargs)
         return await run_in_threadpool(func, *args, **kwargs)
 
     async_func = cast(Callable[..., Awaitable[_V]], func)
@@ -1,13 +1,34 @@
+import collections.abc
+import copy
 import decimal
 import inspect
+import json
+import typing
+import uuid
 from datetime import date, datetime, time
-from functools import wraps
-from typing import Callable, Dict, List, Tuple, Type
+from functools import lru_cache, wraps
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
 
 import typesystem
 
 from .errors import HTTPError
 
+try:
+    # >= 3.7
+    import dataclasses
+except ImportError:  # pragma: no cover
+    dataclasses = None  # type: ignore
+
 FIELD_ALIASES: Dict[Type, typesystem.Field] = {
     int: typesystem.Integer,
     float: typesystem.Float,
@@ -16,107 +37,543 @@ FIELD_ALIASES: Dict[Type, typesystem.Field] = {
     date: typesystem.Date,
     time: typesystem.Time,
     datetime: typesystem.DateTime,
+    uuid.UUID: typesystem.UUID,
+}
+
+# Regexes for the path segments accepted by TypeSystem fields.
+# NOTE: these are looser than the fields' own validation (e.g. they don't
+# check value ranges), which still happens when calling the view.
+_NUMBER = r"\s*[-+]?[\d_.]+(?:[eE][-+]?[\d_]+)?\s*"
+_DATE = r"\d{4}-\d{1,2}-\d{1,2}"
+_TIME = r"\d{1,2}:\d{1,2}(?::\d{1,2}(?:\.\d{1,12})?)?"
+_BOOLEAN = r"(?i:true|false|on|off|1|0)"
+_NULLABLE_BOOLEAN = r"(?i:true|false|on|off|1|0|null|none)"
+
+SEGMENT_REGEXES: Dict[Type[typesystem.Field], str] = {
+    typesystem.Integer: _NUMBER,
+    typesystem.Float: _NUMBER,
+    typesystem.Decimal: _NUMBER,
+    typesystem.Boolean: _BOOLEAN,
+    typesystem.Date: _DATE,
+    typesystem.Time: _TIME,
+    typesystem.DateTime: (
+        _DATE + "[T ]" + _TIME + r"(?:Z|[+-]\d{2}(?::?\d{2})?)?"
+    ),
+    typesystem.UUID: (
+        r"[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-"
+        r"[0-9a-f]{12}"
+    ),
 }
 
 
+# Containers that can be used to annotate multi-valued parameters,
+# e.g. `List[int]` or `Set[str]`. They are validated as TypeSystem arrays,
+# then converted to the given container type (if not a list).
+CONTAINER_ALIASES: Dict[Any, type] = {
+    list: list,
+    typing.List: list,
+    collections.abc.Sequence: list,
+    typing.Sequence: list,
+    set: set,
+    typing.Set: set,
+    frozenset: frozenset,
+    typing.FrozenSet: frozenset,
+    tuple: tuple,
+    typing.Tuple: tuple,
+}
+
+# Default maximum number of values of a multi-valued query parameter.
+# Can be overridden for a parameter by annotating it with an array field,
+# e.g. `typesystem.Array(items=typesystem.Integer(), max_items=5000)`.
+MAX_QUERY_LIST_ITEMS = 1000
+
+
+def _get_container(annotation: Any) -> Tuple[Optional[type], tuple]:
+    # Return the container type and the type arguments of an annotation.
+    # NOTE: `__origin__` is `list` for `List[int]` on Python 3.7+,
+    # but `List` on Python 3.6.
+    origin = getattr(annotation, "__origin__", None)
+    try:
+        container = CONTAINER_ALIASES.get(origin or annotation)
+    except TypeError:
+        # Unhashable annotation.
+        return None, ()
+    if container is None:
+        return None, ()
+    args = tuple(
+        arg
+        for arg in getattr(annotation, "__args__", None) or ()
+        if not isinstance(arg, typing.TypeVar)
+    )
+    return container, args
+
+
+def _get_array_field(container: type, args: tuple) -> typesystem.Array:
+    if container is tuple and args and args[-1] is not Ellipsis:
+        # Fixed-length tuple, e.g. `Tuple[int, str]`.
+        items = [get_field(arg) or typesystem.Any() for arg in args]
+        return typesystem.Array(items=items)
+    items = get_field(args[0]) if args else None
+    return typesystem.Array(items=items)
+
+
+def get_field(annotation: Any) -> Optional[typesystem.Field]:
+    """Return the TypeSystem field for a type annotation, if any."""
+    if isinstance(annotation, typesystem.Field):
+        return annotation
+    container, args = _get_container(annotation)
+    if container is not None:
+        return _get_array_field(container, args)
+    try:
+        return FIELD_ALIASES[annotation]()
+    except (KeyError, TypeError):
+        # NOTE: `TypeError` is raised for unhashable annotations.
+        return None
+
+
+def get_segment_regex(annotation: Any) -> Optional[str]:
+    """Return the regex of path segments accepted by a type annotation.
+
+    `None` is returned if the annotation does not restrict path segments.
+    """
+    field = get_field(annotation)
+    if field is None:
+        return None
+
+    # NOTE: exact type lookup: subclasses may validate values differently.
+    if type(field) is typesystem.Boolean and field.allow_null:
+        return _NULLABLE_BOOLEAN
+    return SEGMENT_REGEXES.get(type(field))
+
+
+def get_segment_regexes(
+    funcs: Iterable[Callable], names: Iterable[str]
+) -> Dict[str, str]:
+    """Return the regexes of path segments accepted by functions.
+
+    # Parameters
+    funcs (list of callables):
+        functions that receive route parameters, e.g. the handlers of a view.
+    names (list of str): names of route parameters.
+
+    # Returns
+    regexes (dict):
+        maps a route parameter to a regex. A parameter is only included if
+        all functions annotate it with a type that restricts path segments
+        in the same way.
+    """
+    signatures = [inspect.signature(func).parameters for func in funcs]
+    if not signatures:
+        return {}
+
+    regexes: Dict[str, str] = {}
+
+    for name in names:
+        candidates = {
+            get_segment_regex(parameters[name].annotation)
+            if name in parameters
+            else None
+            for parameters in signatures
+        }
+        if len(candidates) == 1 and None not in candidates:
+            regexes[name] = candidates.pop()
+
+    return regexes
+
+
 class Converter:
+    """Validate and convert the arguments a function is called with.
+
+    The function's signature is compiled once into a conversion plan: a
+    TypeSystem field for each parameter annotated with a supported type.
+    Other parameters are passed through untouched.
 
-    __slots__ = ("func", "signature", "annotations", "required_params")
+    # Parameters
+    func (callable): the function whose arguments should be converted.
+
+    # Attributes
+    fields (dict): maps parameter names to a TypeSystem field.
+    """
+
+    __slots__ = ("func", "signature", "fields", "_plan")
 
     def __init__(self, func: Callable):
         self.func = func
         self.signature = inspect.signature(self.func)
 
-        self.annotations: Dict[str, Type] = {
-            param.name: param.annotation
-            for param in self.signature.parameters.values()
-            if param.annotation is not inspect.Parameter.empty
-        }
-        self.required_params = set(
-            param.name
-            for param in self.signature.parameters.values()
-            if param.default is inspect.Parameter.empty
-        )
-
-    def convert(self, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
-        bound: inspect.BoundArguments = self.signature.bind(*args, **kwargs)
-
-        errors: List[typesystem.ValidationError] = []
+        self.fields: Dict[str, typesystem.Field] = {}
+        # Tuples of `(name, position, field, container)`, where `position` is
+        # the index of the parameter in positional arguments (if any), and
+        # `container` converts validated arrays (e.g. to a `set`).
+        self._plan: List[
+            Tuple[str, Optional[int], typesystem.Field, Optional[type]]
+        ] = []
 
-        for param_name, value in bound.arguments.items():
-            try:
-                annotation = self.annotations[param_name]
-            except KeyError:
+        for position, param in enumerate(self.signature.parameters.values()):
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            if get_body_validator(param.annotation) is not None:
+                # Request bodies are converted by a `BodyConverter`.
+                continue
+            field = get_field(param.annotation)
+            if field is None:
                 continue
+            self.fields[param.name] = field
+            container, _ = _get_container(param.annotation)
+            if container is list:
+                container = None
+            if param.kind == param.KEYWORD_ONLY:
+                position = None
+            self._plan.append((param.name, position, field, container))
+
+    @property
+    def is_noop(self) -> bool:
+        """Whether calling the function does not require any conversion."""
+        return not self.fields
 
-            # Find the TypeSystem field for the parameter's annotation.
-            if isinstance(annotation, typesystem.Field):
-                field = annotation
+    def convert(self, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+        # NOTE: arguments may be passed positionally, e.g. by the dependency
+        # injection layer.
+        converted_args: Optional[list] = None
+        errors: List[typesystem.Message] = []
+
+        for param_name, position, field, container in self._plan:
+            if position is not None and position < len(args):
+                value = args[position]
+            elif param_name in kwargs:
+                value = kwargs[param_name]
             else:
-                try:
-                    field = FIELD_ALIASES[annotation]()
-                except KeyError:
-                    continue
+                # NOTE: default values are not validated.
+                # It's faster and less bug-prone.
+                continue
 
-            # Perform validation.
             try:
                 value = field.validate(value)
             except typesystem.ValidationError as exc:
                 # NOTE: `add_prefix` sets the key of the error in the final
                 # error's dict representation.
                 errors.extend(exc.messages(add_prefix=param_name))
+                continue
+
+            if container is not None and value is not None:
+                value = container(value)
+
+            if position is not None and position < len(args):
+                if converted_args is None:
+                    converted_args = list(args)
+                converted_args[position] = value
             else:
-                bound.arguments[param_name] = value
+                kwargs[param_name] = value
 
         if errors:
             raise typesystem.ValidationError(messages=errors)
 
-        # NOTE: apply defaults last to prevent validating the default values.
-        # It's faster and less bug-prone.
-        bound.apply_defaults()
+        if converted_args is not None:
+            args = tuple(converted_args)
 
-        return bound.args, bound.kwargs
+        return args, kwargs
 
 
 class ViewConverter(Converter):
+    """Converter for views, which also receive query parameters.
+
+    Parameters with a default value are looked up in the query parameters.
+    Parameters annotated with a container (e.g. `List[int]`) or an array
+    field receive all the values of the query parameter, up to
+    `MAX_QUERY_LIST_ITEMS` values unless the array field sets `max_items`.
+    """
 
-    __slots__ = ("query_parameters",)
+    __slots__ = ("query_parameters", "_list_parameters")
 
     def __init__(self, func):
         super().__init__(func)
 
-        self.query_parameters = set(
+        self.query_parameters: Tuple[str, ...] = tuple(
             param.name
             for param in self.signature.parameters.values()
             if param.default is not inspect.Parameter.empty
+            and param.kind not in (param.VAR_POSITIONAL, param.VAR_KEYWORD)
+            and get_body_validator(param.annotation) is None
         )
 
+        self._list_parameters: FrozenSet[str] = frozenset(
+            name
+            for name in self.query_parameters
+            if isinstance(self.fields.get(name), typesystem.Array)
+        )
+
+        for name in self._list_parameters:
+            field = self.fields[name]
+            if field.max_items is not None:
+                continue
+            # NOTE: copy the field, which may be shared with other views.
+            field = copy.copy(field)
+            field.max_items = MAX_QUERY_LIST_ITEMS
+            self.fields[name] = field
+
+        self._plan = [
+            (name, position, self.fields[name], container)
+            for name, position, _, container in self._plan
+        ]
+
+    @property
+    def is_noop(self) -> bool:
+        return super().is_noop and not self.query_parameters
+
     def get_query_params(self, args: tuple, kwargs: dict) -> dict:
         raise NotImplementedError
 
     def convert(self, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
-        query_params = self.get_query_params(args, kwargs)
+        if self.query_parameters:
+            query_params = self.get_query_params(args, kwargs)
 
-        for param_name in self.query_parameters:
-            if param_name in query_params:
-                kwargs[param_name] = query_params[param_name]
+            for param_name in self.query_parameters:
+                if param_name not in query_params:
+                    continue
+                if param_name in self._list_parameters:
+                    kwargs[param_name] = query_params.getlist(param_name)
+                else:
+                    kwargs[param_name] = query_params[param_name]
 
         return super().convert(args, kwargs)
 
 
 def convert_arguments(func: Callable, converter_class=None) -> Callable:
+    """Wrap a coroutine function so that its arguments get converted.
+
+    If the function does not require any conversion, it is returned as-is.
+
+    # Parameters
+    func (coroutine function): the function to wrap.
+    converter_class (type):
+        a subclass of #::bocadillo.converters#Converter.
+        Defaults to #::bocadillo.converters#Converter.
+    """
     if converter_class is None:
         converter_class = Converter
 
     converter = converter_class(func)
 
+    if converter.is_noop:
+        return func
+
+    convert = converter.convert
+
     @wraps(func)
     async def converted(*args, **kwargs):
-        args, kwargs = converter.convert(args, kwargs)
+        args, kwargs = convert(args, kwargs)
         return await func(*args, **kwargs)
 
     return converted
 
 
+# Maximum size of request bodies converted by a `BodyConverter`, in bytes.
+MAX_BODY_SIZE = 1024 * 1024
+
+
+def _validate_items(
+    validate: Callable[[Any], Any], container: type, value: Any
+) -> Any:
+    # Validate and convert the items of an array in a single pass.
+    if not isinstance(value, list):
+        raise typesystem.ValidationError(text="Must be an array.", code="type")
+
+    items = []
+    errors: List[typesystem.Message] = []
+    for index, item in enumerate(value):
+        try:
+            items.append(validate(item))
+        except typesystem.ValidationError as exc:
+            errors.extend(exc.messages(add_prefix=index))
+
+    if errors:
+        raise typesystem.ValidationError(messages=errors)
+
+    return items if container is list else container(items)
+
+
+def _get_dataclass_validator(cls: type) -> typesystem.Field:
+    properties: Dict[str, typesystem.Field] = {}
+    required: List[str] = []
+
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+        if field.type is str:
+            properties[field.name] = typesystem.String(allow_blank=True)
+        else:
+            properties[field.name] = get_field(field.type) or typesystem.Any()
+        if (
+            field.default is dataclasses.MISSING
+            and field.default_factory is dataclasses.MISSING  # type: ignore
+        ):
+            required.append(field.name)
+
+    # NOTE: unknown properties are dropped.
+    return typesystem.Object(
+        properties=properties, required=required, additional_properties=None
+    )
+
+
+@lru_cache(maxsize=None)
+def _compile_body_validator(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    if isinstance(annotation, type) and issubclass(
+        annotation, typesystem.Schema
+    ):
+        schema = annotation
+        validator = schema.make_validator()
+        # NOTE: instantiating a schema from a dict does not validate it again.
+        return lambda value: schema(validator.validate(value))
+
+    if (
+        dataclasses is not None
+        and isinstance(annotation, type)
+        and dataclasses.is_dataclass(annotation)
+    ):
+        cls = annotation
+        validator = _get_dataclass_validator(cls)
+        return lambda value: cls(**validator.validate(value))
+
+    container, args = _get_container(annotation)
+    if container is not None and len(args) == 1:
+        validate_item = _compile_body_validator(args[0])
+        if validate_item is not None:
+            return lambda value: _validate_items(
+                validate_item, container, value
+            )
+
+    return None
+
+
+def get_body_validator(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Return a validator for request bodies, if the annotation defines one.
+
+    Request bodies can be annotated with a TypeSystem schema, a dataclass,
+    or a container of those (e.g. `List[Item]`).
+
+    Validators are compiled once per annotation.
+
+    # Returns
+    validator (callable):
+        takes the parsed body and returns the converted value, or raises a
+        `typesystem.ValidationError`.
+    """
+    try:
+        return _compile_body_validator(annotation)
+    except TypeError:
+        # NOTE: `TypeError` is raised for unhashable annotations.
+        return None
+
+
+class BodyConverter:
+    """Read, parse and validate the JSON body of a request.
+
+    # Parameters
+    name (str): the name of the view parameter that receives the body.
+    annotation (any):
+        its annotation.
+        See #::bocadillo.converters#get_body_validator.
+    required (bool):
+        whether requests must have a body. If `False`, the parameter is not
+        passed when the body is empty.
+
+    # Attributes
+    max_size (int):
+        requests with a larger body (in bytes) are rejected with a
+        `413 Payload Too Large` error. Defaults to `MAX_BODY_SIZE`.
+    """
+
+    __slots__ = ("name", "validate", "required", "max_size")
+
+    def __init__(self, name: str, annotation: Any, required: bool = True):
+        validate = get_body_validator(annotation)
+        assert validate is not None, f"cannot validate bodies as {annotation}"
+        self.name = name
+        self.validate = validate
+        self.required = required
+        self.max_size = MAX_BODY_SIZE
+
+    async def read(self, req) -> bytes:
+        # NOTE: reject oversized bodies before reading them, or as soon as
+        # they exceed the limit for bodies of unknown length.
+        content_length = req.headers.get("content-length")
+        if content_length is not None:
+            try:
+                too_large = int(content_length) > self.max_size
+            except ValueError:
+                raise HTTPError(400, detail="Invalid Content-Length.")
+            if too_large:
+                raise HTTPError(413)
+
+        chunks = []
+        size = 0
+        async for chunk in req.stream():
+            size += len(chunk)
+            if size > self.max_size:
+                raise HTTPError(413)
+            chunks.append(chunk)
+
+        body = b"".join(chunks)
+        # Allow the view to access the body as well.
+        req._body = body  # pylint: disable=protected-access
+        return body
+
+    async def convert(self, req, kwargs: dict) -> None:
+        body = await self.read(req)
+
+        if not body and not self.required:
+            return
+
+        try:
+            value = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, detail="JSON is malformed.")
+
+        kwargs[self.name] = self.validate(value)
+
+
+def get_body_converter(func: Callable) -> Optional[BodyConverter]:
+    """Return a body converter for a view handler, if it needs one.
+
+    # Raises
+    TypeError: if more than one parameter is annotated as a request body.
+    """
+    converter: Optional[BodyConverter] = None
+
+    for param in inspect.signature(func).parameters.values():
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        if get_body_validator(param.annotation) is None:
+            continue
+        if converter is not None:
+            raise TypeError(
+                f"{func.__name__}() can only receive one request body, "
+                f"got '{converter.name}' and '{param.name}'"
+            )
+        converter = BodyConverter(
+            param.name,
+            param.annotation,
+            required=param.default is inspect.Parameter.empty,
+        )
+
+    return converter
+
+
+def inject_body(func: Callable, converter: BodyConverter) -> Callable:
+    """Wrap an HTTP handler so that it receives the converted request body.
+
+    # Parameters
+    func (coroutine function): an HTTP handler, i.e. `(req, res, **kwargs)`.
+    converter: a #::bocadillo.converters#BodyConverter.
+    """
+
+    @wraps(func)
+    async def with_body(req, res, *args, **kwargs):
+        await converter.convert(req, kwargs)
+        return await func(req, res, *args, **kwargs)
+
+    return with_body
+
+
 async def on_validation_error(req, res, exc: typesystem.ValidationError):
     raise HTTPError(400, detail=dict(exc))
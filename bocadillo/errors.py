@@ -57,28 +57,45 @@ class HTTPError(Exception):
         return self.title
 
 
+# Sentinel for exception classes missing from the handler cache.
+_NOT_CACHED: Any = object()
+
+
 class ServerErrorMiddleware(HTTPApp):
     """Return 500 response when an unhandled exception occurs.
 
     Adaptation of Starlette's `ServerErrorMiddleware`.
+
+    The exception is stored in the request's ASGI scope (under the
+    `"exception"` key) instead of on the middleware, which is shared by
+    concurrent requests. Use [.raise_if_exception()](#raise-if-exception)
+    to re-raise it once the response has been sent.
     """
 
-    __slots__ = ("app", "handler", "exception")
+    __slots__ = ("app", "handler")
 
     def __init__(self, app: HTTPApp, handler: ErrorHandler) -> None:
         self.app = app
         self.handler = handler
-        self.exception: Optional[BaseException] = None
 
-    def raise_if_exception(self):
-        if self.exception is not None:
-            raise self.exception from None
+    @staticmethod
+    def raise_if_exception(req: Request) -> None:
+        """Re-raise the unhandled exception of a request, if any.
+
+        # Parameters
+        req (Request): a request processed by the middleware.
+        """
+        exception: Optional[BaseException] = req.get("exception")
+        if exception is not None:
+            raise exception from None
 
     async def __call__(self, req: Request, res: Response) -> Response:
         try:
             res = await self.app(req, res)
         except BaseException as exc:
-            self.exception = exc
+            # NOTE: Starlette 0.11 only exposes the scope as a read-only
+            # mapping, see `Request.__getitem__()`.
+            req._scope["exception"] = exc  # pylint: disable=protected-access
             await call_async(  # type: ignore
                 self.handler, req, res, HTTPError(500)
             )
@@ -91,25 +108,42 @@ class HTTPErrorMiddleware(HTTPApp):
     """Handle exceptions that occur while handling HTTP requests.
 
     Adaptation of Starlette's `ExceptionMiddleware`.
+
+    The handler for an exception is that of the first class in its method
+    resolution order (MRO) which has one, i.e. the most specific one.
+    Lookups are cached per exception class until a handler is added.
     """
 
-    __slots__ = ("app", "_exception_handlers")
+    __slots__ = ("app", "_exception_handlers", "_handler_cache")
 
     def __init__(self, app: HTTPApp) -> None:
         self.app = app
         self._exception_handlers: Dict[Type[BaseException], ErrorHandler] = {}
+        self._handler_cache: Dict[type, Optional[ErrorHandler]] = {}
 
     def add_exception_handler(
         self, exception_class: Type[_E], handler: ErrorHandler
     ) -> None:
         assert issubclass(exception_class, BaseException)
         self._exception_handlers[exception_class] = handler
+        # NOTE: clear in place, as the cache may be shared (see recipes).
+        self._handler_cache.clear()
 
     def _get_exception_handler(self, exc: _E) -> Optional[ErrorHandler]:
-        for cls, handler in self._exception_handlers.items():
-            if issubclass(type(exc), cls):
-                return handler
-        return None
+        exc_class = type(exc)
+        handler = self._handler_cache.get(exc_class, _NOT_CACHED)
+        if handler is not _NOT_CACHED:
+            return handler
+
+        handlers = self._exception_handlers
+        handler = None
+        for cls in exc_class.__mro__:
+            handler = handlers.get(cls)
+            if handler is not None:
+                break
+
+        self._handler_cache[exc_class] = handler
+        return handler
 
     async def __call__(self, req: Request, res: Response) -> Response:
         response = self.app(req, res)
@@ -0,0 +1,440 @@
+"""Named thread pools for running blocking code."""
+
+import asyncio
+import functools
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from starlette.middleware.wsgi import (
+    WSGIResponder as _WSGIResponder,
+    build_environ,
+)
+from starlette.responses import PlainTextResponse
+
+from .app_types import Receive, Scope, Send
+from .compat import WSGIApp
+from .errors import HTTPError
+
+try:
+    # >= 3.7
+    import contextvars
+except ImportError:  # pragma: no cover
+    contextvars = None  # type: ignore
+
+try:
+    # >= 3.8
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # pragma: no cover
+    resource_tracker = shared_memory = None  # type: ignore
+
+
+class ExecutorBusy(HTTPError):
+    """Raised when an executor's queue is full.
+
+    Subclass of #::bocadillo.errors#HTTPError, which results in a
+    `503 Service Unavailable` error response.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, name: str):
+        super().__init__(503, detail=f"Executor '{name}' is busy.")
+
+
+class ExecutorStats(NamedTuple):
+    """Metrics about an #::bocadillo.executors#Executor.
+
+    # Attributes
+    name (str): the name of the executor.
+    max_workers (int): the maximum number of threads.
+    active (int): the number of calls being run.
+    queued (int): the number of calls waiting for a thread.
+    completed (int): the number of calls that have run.
+    rejected (int): the number of calls rejected because the queue was full.
+    wait_time (float):
+        the total time calls spent waiting for a thread, in seconds.
+    max_wait_time (float):
+        the longest time a call spent waiting for a thread, in seconds.
+    """
+
+    name: str
+    max_workers: int
+    active: int
+    queued: int
+    completed: int
+    rejected: int
+    wait_time: float
+    max_wait_time: float
+
+
+class Executor:
+    """A named, bounded and instrumented pool of threads.
+
+    Executors allow to isolate blocking workloads from one another,
+    e.g. so that slow synchronous views don't starve static files.
+
+    # Parameters
+    name (str): a name for the executor.
+    max_workers (int):
+        the maximum number of threads.
+        Defaults to the same value as `ThreadPoolExecutor`.
+    queue_size (int):
+        the maximum number of calls waiting for a thread. Further calls are
+        rejected with #::bocadillo.executors#ExecutorBusy.
+        Defaults to `None` (unbounded).
+    """
+
+    __slots__ = (
+        "name",
+        "max_workers",
+        "queue_size",
+        "_pool",
+        "_lock",
+        "_active",
+        "_queued",
+        "_completed",
+        "_rejected",
+        "_wait_time",
+        "_max_wait_time",
+    )
+
+    def __init__(
+        self, name: str, max_workers: int = None, queue_size: int = None
+    ):
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        assert max_workers > 0, "max_workers must be positive"
+        assert queue_size is None or queue_size >= 0
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        # NOTE: threads are created lazily, so that the executor can be
+        # used again after being shut down (e.g. across test clients).
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=f"bocadillo-{self.name}",
+            )
+        return self._pool
+
+    def _run(self, submitted_at: float, func: Callable) -> Any:
+        wait_time = time.perf_counter() - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a function in one of the executor's threads.
+
+        # Raises
+        ExecutorBusy: if the queue is full.
+        """
+        with self._lock:
+            if (
+                self.queue_size is not None
+                and self._queued + self._active
+                >= self.max_workers + self.queue_size
+            ):
+                self._rejected += 1
+                raise ExecutorBusy(self.name)
+            self._queued += 1
+
+        child = functools.partial(func, *args, **kwargs)
+        if contextvars is not None:
+            # Ensure we run in the same context.
+            child = functools.partial(contextvars.copy_context().run, child)
+
+        loop = asyncio.get_event_loop()
+        try:
+            future = loop.run_in_executor(
+                self._get_pool(), self._run, time.perf_counter(), child
+            )
+        except RuntimeError:
+            # The call could not be submitted, e.g. the pool was shut down.
+            with self._lock:
+                self._queued -= 1
+            raise
+        return await future
+
+    def stats(self) -> ExecutorStats:
+        """Return a snapshot of the executor's metrics."""
+        with self._lock:
+            return ExecutorStats(
+                name=self.name,
+                max_workers=self.max_workers,
+                active=self._active,
+                queued=self._queued,
+                completed=self._completed,
+                rejected=self._rejected,
+                wait_time=self._wait_time,
+                max_wait_time=self._max_wait_time,
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the executor's threads.
+
+        The executor starts new threads if it is used again.
+        """
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def __repr__(self) -> str:
+        return f"<Executor {self.name!r} max_workers={self.max_workers}>"
+
+
+class WSGIResponder(_WSGIResponder):
+    """Run a WSGI app in an #::bocadillo.executors#Executor.
+
+    Subclass of Starlette's `WSGIResponder`, which uses Starlette's default
+    thread pool.
+    """
+
+    def __init__(self, app: WSGIApp, scope: Scope, executor: Executor):
+        super().__init__(app, scope)
+        self.executor = executor
+
+    async def __call__(self, receive: Receive, send: Send) -> None:
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        environ = build_environ(self.scope, body)
+        sender = self.loop.create_task(self.sender(send))
+        try:
+            try:
+                await self.executor.run(self.wsgi, environ, self.start_response)
+            except ExecutorBusy as exc:
+                # NOTE: the WSGI app has not started responding yet.
+                sender.cancel()
+                response = PlainTextResponse(exc.detail, status_code=503)
+                await response(receive, send)
+                return
+            self.send_queue.append(None)
+            self.send_event.set()
+            await asyncio.wait_for(sender, None)
+            if self.exc_info is not None:
+                raise self.exc_info[0].with_traceback(
+                    self.exc_info[1], self.exc_info[2]
+                )
+        finally:
+            if not sender.done():
+                sender.cancel()  # pragma: no cover
+
+
+# Pickled payloads larger than this (in bytes) are exchanged with worker
+# processes through shared memory instead of the pool's pipes.
+SHARED_MEMORY_THRESHOLD = 1024 * 1024
+
+# A pickled payload: either `(None, data)`, or `(name, size)` if it was
+# written to a block of shared memory.
+_Payload = Tuple[Optional[str], Any]
+
+
+def _dump(obj: Any, threshold: Optional[int]) -> _Payload:
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    if shared_memory is None or threshold is None or len(data) <= threshold:
+        return (None, data)
+
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        block.buf[: len(data)] = data
+    finally:
+        block.close()
+    # NOTE: the receiving process takes ownership of the block (and unlinks
+    # it), so it must not be cleaned up when this process exits.
+    resource_tracker.unregister(block._name, "shared_memory")
+    return (block.name, len(data))
+
+
+def _load(payload: _Payload) -> Any:
+    name, data = payload
+    if name is None:
+        return pickle.loads(data)
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return pickle.loads(block.buf[:data])
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _release(payload: _Payload) -> None:
+    # Free the shared memory block of a payload that won't be loaded.
+    name, _ = payload
+    if name is not None:
+        block = shared_memory.SharedMemory(name=name)
+        block.close()
+        block.unlink()
+
+
+def _call_in_process(payload: _Payload, threshold: Optional[int]) -> _Payload:
+    # Run in a worker process.
+    func, args, kwargs = _load(payload)
+    return _dump(func(*args, **kwargs), threshold)
+
+
+class ProcessPool:
+    """A bounded pool of processes for running CPU-bound functions.
+
+    Functions, their arguments and their return values are exchanged with
+    worker processes using `pickle`. Payloads larger than `shm_threshold`
+    are passed through shared memory (on Python 3.8+).
+
+    The pool is started and stopped with the application, but is also
+    started on first use if needed.
+
+    # Parameters
+    max_workers (int):
+        the number of worker processes.
+        Defaults to the number of CPUs.
+    queue_size (int):
+        the maximum number of calls waiting for a process. Further calls are
+        rejected with #::bocadillo.executors#ExecutorBusy.
+        Defaults to `None` (unbounded).
+    timeout (float):
+        the default maximum time to wait for a result, in seconds.
+        Defaults to `None` (no timeout).
+    shm_threshold (int):
+        size (in bytes) above which pickled payloads are passed through
+        shared memory. Set to `None` to disable shared memory.
+        Defaults to `SHARED_MEMORY_THRESHOLD` (1 MiB).
+    """
+
+    __slots__ = (
+        "max_workers",
+        "queue_size",
+        "timeout",
+        "shm_threshold",
+        "_pool",
+        "_pending",
+    )
+
+    name = "process"
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        queue_size: int = None,
+        timeout: float = None,
+        shm_threshold: Optional[int] = SHARED_MEMORY_THRESHOLD,
+    ):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        assert max_workers > 0, "max_workers must be positive"
+        assert queue_size is None or queue_size >= 0
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.shm_threshold = shm_threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """The number of calls submitted and not completed yet."""
+        return self._pending
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    async def run(
+        self, func: Callable, *args: Any, timeout: float = None, **kwargs: Any
+    ) -> Any:
+        """Run a function in a worker process and return its result.
+
+        # Parameters
+        func (callable):
+            a picklable function, e.g. defined at the top level of a module.
+        timeout (float):
+            maximum time to wait for the result, in seconds.
+            Defaults to the pool's `timeout`.
+
+        # Raises
+        TypeError: if the function or its arguments cannot be pickled.
+        ExecutorBusy: if the queue is full.
+        HTTPError(503): if the result was not available in time.
+        """
+        if (
+            self.queue_size is not None
+            and self._pending >= self.max_workers + self.queue_size
+        ):
+            raise ExecutorBusy(self.name)
+
+        try:
+            payload = _dump((func, args, kwargs), self.shm_threshold)
+        except (pickle.PicklingError, TypeError, AttributeError) as exc:
+            raise TypeError(
+                f"cannot run {getattr(func, '__qualname__', func)!r} in a "
+                f"process: the function and its arguments must be "
+                f"picklable ({exc})"
+            ) from exc
+
+        self.start()
+        assert self._pool is not None
+        try:
+            future = self._pool.submit(
+                _call_in_process, payload, self.shm_threshold
+            )
+        except Exception:
+            _release(payload)
+            raise
+
+        abandoned = False
+
+        def on_done(wrapped: asyncio.Future):
+            self._pending -= 1
+            if abandoned and not wrapped.cancelled():
+                if wrapped.exception() is None:
+                    _release(wrapped.result())
+
+        # NOTE: calls that timed out may keep running in their worker
+        # process. They count against the queue limit until they complete.
+        self._pending += 1
+        wrapped = asyncio.wrap_future(future)
+        wrapped.add_done_callback(on_done)
+
+        if timeout is None:
+            timeout = self.timeout
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(wrapped), timeout)
+        except asyncio.TimeoutError:
+            abandoned = True
+            future.cancel()
+            raise HTTPError(503, detail="Process pool timed out.") from None
+
+        return _load(result)
@@ -1,7 +1,525 @@
+import asyncio
+import inspect
+from collections import OrderedDict
+from contextlib import suppress
+from functools import partial, wraps
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
 from aiodine import Store, scopes
+from aiodine.compat import AsyncExitStack
+from aiodine.consumers import Consumer
+from aiodine.providers import Provider, SessionProvider
+
+# A provider, along with the names of the providers it receives.
+_Step = Tuple[Provider, Tuple[str, ...]]
+
+# Providers grouped in levels, such that providers only receive providers
+# from previous levels.
+_Plan = List[List[_Step]]
+
+
+class InjectionStore(Store):
+    """An aiodine store that keeps track of changes to its providers.
+
+    # Attributes
+    version (int):
+        incremented every time a provider is registered, so that consumers
+        know when their resolved providers are stale.
+    """
+
+    __slots__ = ("version",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def _add(self, prov: Provider):
+        super()._add(prov)
+        self.version += 1
+
+    def provider(
+        self,
+        func: Callable = None,
+        scope: str = None,
+        name: str = None,
+        lazy: bool = False,
+        autouse: bool = False,
+        cache: float = None,
+        cache_size: int = 128,
+        cache_key: Callable = None,
+    ) -> Provider:
+        """Declare a provider, optionally caching its values.
+
+        See `aiodine.Store.provider()` for the other parameters.
+
+        # Parameters
+        cache (float):
+            if given, values of the provider are cached for this many seconds.
+            See #::bocadillo.injection#ProviderCache.
+            Only request-scoped providers that return a value (not yield
+            providers) can be cached.
+        cache_size (int):
+            the maximum number of cached values. Defaults to `128`.
+        cache_key (callable):
+            computes the cache key from the providers the provider receives,
+            passed as keyword arguments. Defaults to the tuple of their values.
+
+        # Raises
+        ValueError: if `cache` is given for an app-scoped or yield provider.
+        """
+        if func is None:
+            return partial(
+                self.provider,
+                scope=scope,
+                name=name,
+                lazy=lazy,
+                autouse=autouse,
+                cache=cache,
+                cache_size=cache_size,
+                cache_key=cache_key,
+            )
+
+        if cache is not None:
+            if self.scope_aliases.get(scope, scope) == scopes.SESSION:
+                raise ValueError("app-scoped providers cannot be cached")
+            if inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(
+                func
+            ):
+                raise ValueError("yield providers cannot be cached")
+            func = _cached(
+                func, ProviderCache(cache, maxsize=cache_size, key=cache_key)
+            )
+
+        return super().provider(
+            func, scope=scope, name=name, lazy=lazy, autouse=autouse
+        )
+
+    def consumer(self, consumer_function) -> "InjectedFunction":
+        return InjectedFunction(self, consumer_function)
+
+    def freeze(self):
+        # NOTE: function-scoped providers are evaluated by the consumers that
+        # use them (see `InjectedFunction`), along with their own providers.
+        # Only session-scoped providers need to resolve their providers.
+        for prov in self.session_providers.values():
+            if not isinstance(prov.func, InjectedFunction):
+                prov.func = self.consumer(prov.func)
+
+
+async def _enter_agen(agen, stack: AsyncExitStack) -> Any:
+    # Run the setup code of a yield provider, and register its finalization
+    # code on the exit stack.
+    value = await agen.asend(None)
+    stack.push_async_callback(partial(_terminate_agen, agen))
+    return value
+
+
+async def _terminate_agen(agen):
+    # Run the finalization code of a yield provider.
+    with suppress(StopAsyncIteration):
+        await agen.asend(None)
+
+
+async def _gather(awaitables: Iterable[Awaitable]) -> list:
+    # Like `asyncio.gather()`, but cancel other awaitables on failure, so
+    # that none of them outlives the exit stack it registers cleanup on.
+    tasks = [asyncio.ensure_future(value) for value in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class ProviderCacheInfo(NamedTuple):
+    """Statistics about a #::bocadillo.injection#ProviderCache."""
+
+    hits: int
+    misses: int
+    shared: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class ProviderCache:
+    """A bounded LRU cache of provider values that expire after a delay.
+
+    Concurrent misses for the same key share a single computation of the
+    value ("single-flight"). Its result is cached unless it failed, in which
+    case all callers receive the exception. If all callers are cancelled,
+    the computation still completes and its result is cached.
+
+    # Parameters
+    ttl (float): the time after which values expire, in seconds.
+    maxsize (int): the maximum number of cached values. Defaults to `128`.
+    key (callable):
+        computes a cache key from the keyword arguments of the provider.
+        Defaults to the tuple of their values, which must then be hashable.
+
+    # Attributes
+    hits (int): the number of values served from the cache.
+    misses (int): the number of values that had to be computed.
+    shared (int):
+        the number of misses that waited for a computation already in
+        progress instead of starting a new one.
+    evictions (int):
+        the number of least recently used values dropped to make room for
+        new ones.
+    """
+
+    __slots__ = (
+        "ttl",
+        "maxsize",
+        "key",
+        "_entries",
+        "_pending",
+        "hits",
+        "misses",
+        "shared",
+        "evictions",
+    )
+
+    def __init__(self, ttl: float, maxsize: int = 128, key: Callable = None):
+        assert ttl > 0, "ttl must be positive"
+        assert maxsize > 0, "maxsize must be a positive integer"
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.key = key
+        # Values, along with the time they expire at.
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        # Computations in progress.
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    def get_key(self, kwargs: Dict[str, Any]) -> Hashable:
+        """Return the cache key for keyword arguments of the provider."""
+        if self.key is not None:
+            return self.key(**kwargs)
+        return tuple(kwargs.values())
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable]) -> Any:
+        """Return the value for `key`, computing it if needed.
+
+        # Parameters
+        key (hashable): a cache key.
+        compute (callable): returns an awaitable of the value.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if asyncio.get_event_loop().time() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        future = self._pending.get(key)
+        if future is None:
+            self.misses += 1
+            future = self._pending[key] = asyncio.ensure_future(compute())
+            future.add_done_callback(partial(self._set, key))
+        else:
+            self.shared += 1
+
+        # NOTE: don't cancel the computation when a caller is cancelled,
+        # as other callers may be waiting for it.
+        return await asyncio.shield(future)
+
+    def _set(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._pending.get(key) is not future:
+            # The cache was cleared in the meantime.
+            return
+        del self._pending[key]
+
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        expires_at = asyncio.get_event_loop().time() + self.ttl
+        self._entries[key] = (expires_at, future.result())
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all values. Statistics are kept.
+
+        Values being computed are not cached once computed.
+        """
+        self._entries.clear()
+        self._pending.clear()
+
+    def info(self) -> ProviderCacheInfo:
+        """Return statistics about the cache.
+
+        # Returns
+        info (ProviderCacheInfo):
+            a named tuple of `hits`, `misses`, `shared`, `evictions`,
+            `maxsize` and `currsize`.
+        """
+        return ProviderCacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            shared=self.shared,
+            evictions=self.evictions,
+            maxsize=self.maxsize,
+            currsize=len(self._entries),
+        )
+
+
+def _cached(func: Callable, cache: ProviderCache) -> Callable:
+    # Wrap a provider function so that its values are cached.
+    # NOTE: `wraps()` preserves the signature and `@useprovider` declarations,
+    # so the providers of `func` are still resolved.
+    async def compute(kwargs: Dict[str, Any]) -> Any:
+        value = func(**kwargs)
+        if inspect.isawaitable(value):
+            value = await value
+        return value
+
+    @wraps(func)
+    async def cached(**kwargs):
+        return await cache.get(cache.get_key(kwargs), partial(compute, kwargs))
+
+    cached.cache = cache
+    return cached
+
+
+class InjectedFunction(Consumer):
+    # A function whose parameters are resolved against registered providers.
+    # NOTE: no docstring, as the wrapped function's `__doc__` is copied onto
+    # a slot, which a class docstring would shadow.
+    #
+    # Providers are resolved when the function is declared, and again only
+    # after other providers have been registered.
+    #
+    # If the function does not use any provider, it is called directly, i.e.
+    # with no injection overhead. The exception are calls that aiodine
+    # would process differently from Python, e.g. with keyword arguments
+    # that the function does not accept (aiodine drops them).
+    #
+    # Otherwise, the providers it needs (including the providers of
+    # function-scoped providers) are evaluated once per call. Providers that
+    # don't depend on each other are evaluated concurrently, and finalization
+    # code of yield providers runs in reverse dependency order.
+
+    __slots__ = (
+        "__doc__",
+        "_version",
+        "_positional",
+        "_keyword",
+        "_external",
+        "_roots",
+        "_plans",
+        "_direct_kwargs",
+    )
+
+    def __init__(self, store: InjectionStore, consumer_function):
+        super().__init__(store, consumer_function)
+        self._version = -1
+        # Parameters, along with their provider (if any).
+        self._positional: List[Tuple[str, Optional[Provider]]] = []
+        self._keyword: Dict[str, Optional[Provider]] = {}
+        # Autouse providers and providers declared with `@useprovider`.
+        self._external: List[Provider] = []
+        # Names of parameters that have a provider.
+        self._roots: FrozenSet[str] = frozenset()
+        # Evaluation plans, by names of parameters whose provider is
+        # overridden by a keyword argument.
+        self._plans: Dict[FrozenSet[str], _Plan] = {}
+        # Maps the number of positional arguments of a call to the names of
+        # keyword arguments that can be passed as-is, if it can be direct.
+        self._direct_kwargs: Dict[int, FrozenSet[str]] = {}
+        self._compile()
+
+    def _compile(self) -> None:
+        store: InjectionStore = self.store
+        self._version = store.version
+        self._positional = []
+        self._keyword = {}
+        self._external = [
+            *store.autouse_providers.values(),
+            *store.get_used_providers(self.func),
+        ]
+        self._plans = {}
+        self._direct_kwargs = {}
+
+        parameters = inspect.signature(self.func).parameters.values()
+        for param in parameters:
+            prov = store.providers.get(param.name)
+            if param.kind == param.KEYWORD_ONLY:
+                self._keyword[param.name] = prov
+            else:
+                self._positional.append((param.name, prov))
+
+        self._roots = frozenset(
+            name
+            for name, prov in [*self._positional, *self._keyword.items()]
+            if prov is not None
+        )
+
+        if self._external or self._roots:
+            return
+
+        positional = []
+        keyword = []
+        for param in parameters:
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                return
+            if param.kind == param.KEYWORD_ONLY:
+                keyword.append(param.name)
+            else:
+                positional.append(param.name)
+
+        self._direct_kwargs = {
+            count: frozenset(positional[count:] + keyword)
+            for count in range(len(positional) + 1)
+        }
+
+    def _get_dependencies(
+        self, prov: Provider
+    ) -> Tuple[List[Provider], Tuple[str, ...]]:
+        # Return the providers a provider depends on, and the names of those
+        # it receives as arguments.
+        if isinstance(prov, SessionProvider):
+            # NOTE: these resolve their own providers when the session starts.
+            return [], ()
+
+        store: InjectionStore = self.store
+        names = tuple(
+            name
+            for name in inspect.signature(prov.func).parameters
+            if name in store.providers
+        )
+        dependencies = [
+            *(store.providers[name] for name in names),
+            *store.get_used_providers(prov.func),
+        ]
+        return dependencies, names
+
+    def _build_plan(self, overridden: FrozenSet[str]) -> _Plan:
+        levels: Dict[str, int] = {}
+        steps: List[Tuple[int, _Step]] = []
+
+        def visit(prov: Provider) -> int:
+            level = levels.get(prov.name)
+            if level is None:
+                dependencies, names = self._get_dependencies(prov)
+                level = 1 + max(map(visit, dependencies), default=-1)
+                levels[prov.name] = level
+                steps.append((level, (prov, names)))
+            return level
+
+        for prov in self._external:
+            visit(prov)
+        for name, prov in [*self._positional, *self._keyword.items()]:
+            if prov is not None and name not in overridden:
+                visit(prov)
+
+        plan: _Plan = [[] for _ in set(levels.values())]
+        for level, step in steps:
+            plan[level].append(step)
+        return plan
+
+    @staticmethod
+    def _provide(
+        prov: Provider, kwargs: Dict[str, Any], stack: AsyncExitStack
+    ) -> Awaitable:
+        # NOTE: return an awaitable, as values of lazy providers are.
+        if isinstance(prov, SessionProvider):
+            return prov(stack)
+
+        value = prov.func(**kwargs)
+
+        if inspect.isasyncgen(value):
+            return _enter_agen(value, stack)
+
+        return value
+
+    async def _inject(self, plan: _Plan, args: tuple, kwargs: dict) -> Any:
+        async with AsyncExitStack() as stack:
+            values: Dict[str, Any] = {}
+
+            for level in plan:
+                pending: List[Tuple[str, Awaitable]] = []
+                for prov, names in level:
+                    value = self._provide(
+                        prov, {name: values[name] for name in names}, stack
+                    )
+                    if prov.lazy:
+                        values[prov.name] = value
+                    else:
+                        pending.append((prov.name, value))
+
+                if len(pending) == 1:
+                    name, value = pending[0]
+                    values[name] = await value
+                elif pending:
+                    results = await _gather(value for _, value in pending)
+                    values.update(zip((name for name, _ in pending), results))
+
+            # NOTE: same rules as aiodine, i.e. keyword arguments win over
+            # providers, and positional arguments fill other parameters.
+            remaining = list(reversed(args))
+            injected_args = []
+            for name, prov in self._positional:
+                if name in kwargs:
+                    injected_args.append(kwargs.pop(name))
+                elif prov is None:
+                    with suppress(IndexError):
+                        injected_args.append(remaining.pop())
+                else:
+                    injected_args.append(values[name])
+
+            injected_kwargs = {}
+            for name, prov in self._keyword.items():
+                if name in kwargs:
+                    injected_kwargs[name] = kwargs.pop(name)
+                elif prov is not None:
+                    injected_kwargs[name] = values[name]
+
+            return await self.func(*injected_args, **injected_kwargs)
+
+    def __call__(self, *args, **kwargs) -> Awaitable:
+        # NOTE: return the awaitable instead of awaiting it, so that direct
+        # calls do not cost an extra coroutine frame.
+        if self._version != self.store.version:
+            self._compile()
+
+        direct_kwargs = self._direct_kwargs.get(len(args))
+        if direct_kwargs is not None and direct_kwargs.issuperset(kwargs):
+            return self.func(*args, **kwargs)
+
+        overridden = self._roots.intersection(kwargs)
+        plan = self._plans.get(overridden)
+        if plan is None:
+            plan = self._plans[overridden] = self._build_plan(overridden)
+
+        return self._inject(plan, args, kwargs)
+
 
 # pylint: disable=invalid-name
-_STORE = Store(
+_STORE = InjectionStore(
     scope_aliases={"request": scopes.FUNCTION, "app": scopes.SESSION},
     providers_module="providerconf",
     default_scope=scopes.FUNCTION,
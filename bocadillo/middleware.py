@@ -1,6 +1,25 @@
-from typing import TYPE_CHECKING, Optional
-
-from .app_types import ASGIApp, ASGIAppInstance, HTTPApp, Scope
+import inspect
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .app_types import (
+    ASGI3App,
+    ASGIApp,
+    ASGIAppInstance,
+    HTTPApp,
+    Receive,
+    Scope,
+    Send,
+)
+from .asgi import asgi3
 from .compat import call_async
 from .request import Request
 from .response import Response
@@ -91,9 +110,121 @@ class Middleware(HTTPApp):
     __call__ = process
 
 
-class ASGIMiddleware(ASGIApp):
+# An async `(req, res) -> Optional[Response]` callable.
+_Hook = Callable[[Request, Response], Awaitable[Optional[Response]]]
+
+
+def _get_hook(middleware: Middleware, name: str) -> Optional[_Hook]:
+    # Return the bound hook if the middleware class overrides it.
+    if getattr(type(middleware), name) is getattr(Middleware, name):
+        return None
+    hook = getattr(middleware, name)
+    if inspect.iscoroutinefunction(hook):
+        return hook
+    return partial(call_async, hook, sync=True)
+
+
+def _is_compilable(middleware: HTTPApp) -> bool:
+    # Middleware that customize how they are called must be kept.
+    # NOTE: `__call__` is an alias of `Middleware.process`, so overriding
+    # `process()` alone does not change how a middleware is called.
+    return (
+        isinstance(middleware, Middleware)
+        and type(middleware).__call__ is Middleware.__call__
+    )
+
+
+class MiddlewarePipeline(HTTPApp):
+    """A stack of middleware compiled into a flat list of hooks.
+
+    Behaves exactly like the nested middleware it was compiled from, but
+    only calls the `before_dispatch()` and `after_dispatch()` hooks that
+    middleware classes actually override, in a single loop.
+
+    # Parameters
+    layers (list):
+        `(before_dispatch, after_dispatch)` tuples, from the outermost
+        middleware to the innermost one. Either hook may be `None`.
+    inner (HTTPApp): the app wrapped by the innermost middleware.
+    """
+
+    __slots__ = ("layers", "inner")
+
+    def __init__(
+        self,
+        layers: List[Tuple[Optional[_Hook], Optional[_Hook]]],
+        inner: HTTPApp,
+    ):
+        self.layers = layers
+        self.inner = inner
+
+    async def __call__(self, req: Request, res: Response) -> Response:
+        layers = self.layers
+        depth = 0
+
+        for before, _ in layers:
+            if before is not None:
+                before_res = await before(req, res)
+                if before_res:
+                    # NOTE: the hooks of this layer stop here, but outer
+                    # layers still process the response.
+                    res = before_res
+                    break
+            depth += 1
+        else:
+            res = await self.inner(req, res)
+
+        for index in range(depth - 1, -1, -1):
+            after = layers[index][1]
+            if after is not None:
+                res = await after(req, res) or res
+
+        return res
+
+
+def compile_middleware(app: HTTPApp) -> HTTPApp:
+    """Compile a stack of #::bocadillo.middleware#Middleware.
+
+    Consecutive middleware are merged into a
+    #::bocadillo.middleware#MiddlewarePipeline, and middleware that don't
+    override any hook are removed. Middleware that override `__call__()`
+    are kept as-is, but their inner app is compiled too.
+
+    # Parameters
+    app (HTTPApp): the outermost HTTP app of the stack.
+
+    # Returns
+    app (HTTPApp): an equivalent HTTP app.
+    """
+    layers: List[Tuple[Optional[_Hook], Optional[_Hook]]] = []
+
+    while _is_compilable(app):
+        middleware: Middleware = app  # type: ignore
+        before = _get_hook(middleware, "before_dispatch")
+        after = _get_hook(middleware, "after_dispatch")
+        if before is not None or after is not None:
+            layers.append((before, after))
+        app = middleware.inner
+
+    if isinstance(app, Middleware):
+        app.inner = compile_middleware(app.inner)
+
+    if not layers:
+        return app
+
+    return MiddlewarePipeline(layers, app)
+
+
+class ASGIMiddleware(ASGI3App):
     """Base class for ASGI middleware classes.
 
+    ASGI middleware implements the ASGI 3 interface, i.e.
+    `async def __call__(self, scope, receive, send)`.
+
+    Subclasses that override `__call__()` with the legacy ASGI 2 interface,
+    i.e. `def __call__(self, scope)`, are still supported: their `inner`
+    middleware is then an ASGI 2 app.
+
     # Parameters
     inner (callable): the inner middleware.
     app (App): the application instance.
@@ -101,10 +232,16 @@ class ASGIMiddleware(ASGIApp):
         Keyword arguments passed when registering the middleware on `app`.
     """
 
-    def __init__(self, inner: ASGIApp, app: "App", **kwargs):
+    def __init__(self, inner: Union[ASGI3App, ASGIApp], app: "App", **kwargs):
         self.inner = inner
         self.app = app
         self.kwargs = kwargs
 
-    def __call__(self, scope: Scope) -> ASGIAppInstance:
-        return self.inner(scope)
+    @asgi3
+    def __call__(
+        self, scope: Scope, receive: Receive = None, send: Send = None
+    ) -> Union[Awaitable[None], ASGIAppInstance]:
+        if receive is None:
+            # Legacy ASGI 2 subclass calling `super().__call__(scope)`.
+            return self.inner(scope)
+        return self.inner(scope, receive, send)
@@ -0,0 +1,144 @@
+"""Index of apps mounted on an application, looked up by path prefix."""
+
+from typing import Any, Dict, Iterator, List, Optional
+
+from .asgi import count_required_args
+
+# Kinds of mounted apps.
+APP = "app"  # A Bocadillo application.
+ASGI = "asgi"  # ASGI 2, i.e. `app(scope)(receive, send)`.
+ASGI3 = "asgi3"  # ASGI 3, i.e. `app(scope, receive, send)`.
+WSGI = "wsgi"
+
+KINDS = (APP, ASGI, ASGI3, WSGI)
+
+
+def get_app_kind(app: Any) -> Optional[str]:
+    """Tell whether an app implements the ASGI or the WSGI interface.
+
+    The check relies on the app's signature: WSGI apps accept
+    `(environ, start_response)`, ASGI 2 apps accept `(scope)` and ASGI 3 apps
+    accept `(scope, receive, send)`.
+
+    # Returns
+    kind (str):
+        `"asgi"`, `"asgi3"`, `"wsgi"`, or `None` if the signature is
+        ambiguous, e.g. it accepts `*args` or cannot be inspected.
+    """
+    return {1: ASGI, 2: WSGI, 3: ASGI3}.get(count_required_args(app))
+
+
+class Mount:
+    """An app mounted at a path prefix.
+
+    # Parameters
+    prefix (str): the path prefix, e.g. `"/api"`.
+    app: the mounted app.
+    kind (str):
+        one of `"app"`, `"asgi"`, `"asgi3"` or `"wsgi"`. If not given, it is
+        inferred from the app's signature.
+    executor:
+        an optional #::bocadillo.executors#Executor to run a WSGI app in.
+
+    # Attributes
+    kind (str):
+        the kind of app, or `None` if it could not be inferred from the app's
+        signature. In that case, the app is probed on its first request,
+        and treated as WSGI if calling it with the ASGI scope raises a
+        `TypeError`.
+    """
+
+    __slots__ = ("prefix", "app", "kind", "executor")
+
+    def __init__(
+        self, prefix: str, app: Any, kind: str = None, executor: Any = None
+    ):
+        assert kind is None or kind in KINDS, f"kind must be one of {KINDS}"
+        self.prefix = prefix
+        self.app = app
+        self.kind = kind if kind is not None else get_app_kind(app)
+        self.executor = executor
+
+
+class _Node:
+    __slots__ = ("children", "mount")
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = {}
+        self.mount: Optional[Mount] = None
+
+
+def _split(path: str) -> List[str]:
+    path = path.strip("/")
+    return path.split("/") if path else []
+
+
+class MountIndex:
+    """Find mounted apps by longest path prefix.
+
+    Prefixes only match on segment boundaries: an app mounted at `/api`
+    handles `/api` and `/api/users`, but not `/api-v2`.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self):
+        self._root = _Node()
+
+    def _find_node(self, prefix: str, create: bool = False) -> Optional[_Node]:
+        node = self._root
+        for segment in _split(prefix):
+            child = node.children.get(segment)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[segment] = _Node()
+            node = child
+        return node
+
+    def add(
+        self, prefix: str, app: Any, kind: str = None, executor: Any = None
+    ) -> Mount:
+        """Mount an app at the given prefix.
+
+        Any app previously mounted at the same prefix (regardless of
+        a trailing slash) is replaced.
+        """
+        node = self._find_node(prefix, create=True)
+        node.mount = Mount(prefix, app, kind=kind, executor=executor)
+        return node.mount
+
+    def get(self, prefix: str) -> Optional[Mount]:
+        """Return the mount registered at exactly `prefix`, if any."""
+        node = self._find_node(prefix)
+        return None if node is None else node.mount
+
+    def __iter__(self) -> Iterator[Mount]:
+        # Yield all mounts, parents first.
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop(0)
+            if node.mount is not None:
+                yield node.mount
+            nodes.extend(node.children.values())
+
+    def match(self, path: str) -> Optional[Mount]:
+        """Return the mount with the longest prefix of `path`, if any."""
+        node: Optional[_Node] = self._root
+        found: Optional[Mount] = None
+
+        for segment in path[1:].split("/"):
+            mount = node.mount
+            # NOTE: the check is only relevant for prefixes with a
+            # trailing slash.
+            if mount is not None and path.startswith(mount.prefix):
+                found = mount
+            node = node.children.get(segment)
+            if node is None:
+                return found
+
+        mount = node.mount
+        if mount is not None and path.startswith(mount.prefix):
+            found = mount
+
+        return found
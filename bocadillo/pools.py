@@ -0,0 +1,438 @@
+"""Async pools of reusable resources, e.g. database connections."""
+
+import asyncio
+from collections import deque
+from typing import Any, Callable, Deque, NamedTuple, Optional, Tuple
+
+from .compat import call_async
+from .errors import HTTPError
+from .injection import provider
+
+
+class PoolTimeout(HTTPError):
+    """Raised when no resource of a pool became available in time.
+
+    Subclass of #::bocadillo.errors#HTTPError, which results in a
+    `503 Service Unavailable` error response.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, name: str):
+        super().__init__(503, detail=f"Pool '{name}' timed out.")
+
+
+class PoolStats(NamedTuple):
+    """Metrics about a #::bocadillo.pools#Pool.
+
+    # Attributes
+    name (str): the name of the pool.
+    max_size (int): the maximum number of resources.
+    size (int): the number of resources, including those being created.
+    idle (int): the number of resources available for checkout.
+    in_use (int): the number of resources checked out.
+    waiting (int): the number of calls waiting for a resource.
+    acquired (int): the number of resources that have been checked out.
+    timeouts (int): the number of calls that timed out.
+    discarded (int):
+        the number of resources closed because they failed a health check
+        or were idle for too long.
+    wait_time (float):
+        the total time calls spent waiting for a resource, in seconds.
+    max_wait_time (float):
+        the longest time a call spent waiting for a resource, in seconds.
+    utilization (float):
+        the proportion of `max_size` that is checked out, between 0 and 1.
+    """
+
+    name: str
+    max_size: int
+    size: int
+    idle: int
+    in_use: int
+    waiting: int
+    acquired: int
+    timeouts: int
+    discarded: int
+    wait_time: float
+    max_wait_time: float
+    utilization: float
+
+
+class Pool:
+    """A bounded and instrumented async pool of reusable resources.
+
+    Resources are created on demand, up to `max_size`, and are reused once
+    released. Functions given to the pool (`factory`, `check` and `close`)
+    can be synchronous or asynchronous, and are called as described in
+    #::bocadillo.compat#call_async.
+
+    # Parameters
+    factory (callable): creates a new resource.
+    name (str): a name for the pool. Defaults to the name of `factory`.
+    min_size (int):
+        the number of resources created by [.start()](#start), and below
+        which idle resources are not evicted. Defaults to `0`.
+    max_size (int): the maximum number of resources. Defaults to `10`.
+    timeout (float):
+        the maximum time to wait for a resource when all of them are in use,
+        in seconds. Further calls fail with #::bocadillo.pools#PoolTimeout.
+        Defaults to `None` (no timeout).
+    max_idle (float):
+        the time after which idle resources are closed, in seconds.
+        Idle resources are evicted when resources are acquired or released.
+        Defaults to `None` (resources are kept forever).
+    check (callable):
+        an optional health check, called with a resource when it is checked
+        out from the idle resources. If it returns a falsy value or raises
+        an exception, the resource is closed and another one is used.
+    close (callable): an optional function that disposes of a resource.
+    """
+
+    __slots__ = (
+        "factory",
+        "name",
+        "min_size",
+        "max_size",
+        "timeout",
+        "max_idle",
+        "check",
+        "close_resource",
+        "_idle",
+        "_waiters",
+        "_size",
+        "_in_use",
+        "_closed",
+        "_acquired",
+        "_timeouts",
+        "_discarded",
+        "_wait_time",
+        "_max_wait_time",
+    )
+
+    def __init__(
+        self,
+        factory: Callable,
+        *,
+        name: str = None,
+        min_size: int = 0,
+        max_size: int = 10,
+        timeout: float = None,
+        max_idle: float = None,
+        check: Callable = None,
+        close: Callable = None,
+    ):
+        assert max_size > 0, "max_size must be positive"
+        assert 0 <= min_size <= max_size, "min_size must be within max_size"
+        self.factory = factory
+        self.name = name or getattr(factory, "__name__", "pool")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check = check
+        self.close_resource = close
+        # Idle resources, along with the time they were released at.
+        # NOTE: most recently released resources are checked out first,
+        # so that the least used ones end up being evicted.
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        # Futures of calls waiting for a resource. They receive either
+        # a released resource, or `None` if they may create one.
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._acquired = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    @property
+    def closed(self) -> bool:
+        """Whether the pool has been closed."""
+        return self._closed
+
+    async def start(self) -> None:
+        """Create resources until there are `min_size` of them.
+
+        A closed pool can be started again.
+        """
+        self._closed = False
+        missing = self.min_size - self._size
+        if missing <= 0:
+            return
+
+        self._size += missing
+        results = await asyncio.gather(
+            *(call_async(self.factory) for _ in range(missing)),
+            return_exceptions=True,
+        )
+
+        now = asyncio.get_event_loop().time()
+        errors = []
+        for result in results:
+            if isinstance(result, Exception):
+                self._size -= 1
+                errors.append(result)
+            else:
+                self._idle.append((result, now))
+
+        if errors:
+            raise errors[0]
+
+    async def close(self) -> None:
+        """Close idle resources and reject further calls.
+
+        Resources in use are closed when they are released.
+        """
+        self._closed = True
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(RuntimeError("pool is closed"))
+
+        while self._idle:
+            resource, _ = self._idle.pop()
+            await self._dispose(resource)
+
+    async def __aenter__(self) -> "Pool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _dispose(self, resource: Any) -> None:
+        self._size -= 1
+        try:
+            if self.close_resource is not None:
+                await call_async(self.close_resource, resource)
+        finally:
+            # A resource may now be created by a waiting call.
+            self._hand_over(None)
+
+    def _hand_over(self, resource: Any) -> bool:
+        # Give a resource (or, if `None`, the right to create one) to the
+        # first waiting call, if any.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(resource)
+                return True
+        return False
+
+    async def _evict_idle(self) -> None:
+        if self.max_idle is None:
+            return
+        deadline = asyncio.get_event_loop().time() - self.max_idle
+        # NOTE: the least recently released resources are on the left.
+        while (
+            self._idle
+            and self._idle[0][1] < deadline
+            and self._size > self.min_size
+        ):
+            resource, _ = self._idle.popleft()
+            self._discarded += 1
+            await self._dispose(resource)
+
+    async def _is_healthy(self, resource: Any) -> bool:
+        if self.check is None:
+            return True
+        try:
+            return bool(await call_async(self.check, resource))
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+    async def _create(self) -> Any:
+        self._size += 1
+        try:
+            return await call_async(self.factory)
+        except BaseException:
+            self._size -= 1
+            self._hand_over(None)
+            raise
+
+    async def _wait(self, deadline: Optional[float]) -> Any:
+        loop = asyncio.get_event_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+
+        timeout = None if deadline is None else max(0, deadline - loop.time())
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except BaseException:
+            # NOTE: the calling task was cancelled. Pass along whatever it may
+            # have been handed over in the meantime.
+            if not waiter.done():
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            elif waiter.exception() is None:
+                self._put_back(waiter.result())
+            raise
+
+        if not waiter.done():
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            self._timeouts += 1
+            raise PoolTimeout(self.name)
+
+        return waiter.result()
+
+    async def acquire(self) -> Any:
+        """Check out a resource, creating one if needed and allowed.
+
+        The resource must be given back using [.release()](#release).
+
+        # Raises
+        PoolTimeout: if no resource became available in time.
+        RuntimeError: if the pool is closed.
+        """
+        loop = asyncio.get_event_loop()
+        started_at = loop.time()
+        deadline = None if self.timeout is None else started_at + self.timeout
+
+        await self._evict_idle()
+
+        while True:
+            if self._closed:
+                raise RuntimeError("pool is closed")
+
+            while self._idle:
+                resource, _ = self._idle.pop()
+                if await self._is_healthy(resource):
+                    return self._check_out(resource, started_at)
+                self._discarded += 1
+                await self._dispose(resource)
+
+            if self._size < self.max_size:
+                resource = await self._create()
+                return self._check_out(resource, started_at)
+
+            resource = await self._wait(deadline)
+            if resource is not None:
+                # NOTE: handed over by `.release()`, i.e. it was in use and
+                # is not checked for health.
+                return self._check_out(resource, started_at)
+
+    def _check_out(self, resource: Any, started_at: float) -> Any:
+        wait_time = asyncio.get_event_loop().time() - started_at
+        self._in_use += 1
+        self._acquired += 1
+        self._wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+        return resource
+
+    async def release(self, resource: Any, discard: bool = False) -> None:
+        """Give back a resource obtained with [.acquire()](#acquire).
+
+        # Parameters
+        resource: the resource.
+        discard (bool):
+            whether to close the resource instead of reusing it, e.g.
+            because it is known to be broken. Defaults to `False`.
+        """
+        self._in_use -= 1
+
+        if discard or self._closed:
+            await self._dispose(resource)
+            return
+
+        self._put_back(resource)
+        await self._evict_idle()
+
+    def _put_back(self, resource: Any) -> None:
+        # Give a resource to a waiting call, or keep it for later use.
+        # NOTE: `None` means "a resource may be created" to waiting calls.
+        if resource is None:
+            self._hand_over(None)
+        elif not self._hand_over(resource):
+            self._idle.append((resource, asyncio.get_event_loop().time()))
+
+    def resource(self) -> "Lease":
+        """Check out a resource for the duration of an `async with` block.
+
+        # Example
+
+        ```python
+        async with pool.resource() as connection:
+            ...
+        ```
+
+        # Returns
+        lease (Lease): a #::bocadillo.pools#Lease.
+        """
+        return Lease(self)
+
+    def provide(self, name: str = None) -> None:
+        """Declare providers for the pool and its resources.
+
+        - An app-scoped provider named `"<name>_pool"`, which gives access
+        to the pool itself. It starts the pool when the application starts up
+        (creating `min_size` resources) and closes it on shutdown.
+        - A request-scoped provider named `name`, which checks out a resource
+        for the duration of the request.
+
+        # Parameters
+        name (str):
+            the name of the resource provider.
+            Defaults to the name of the pool.
+        """
+        if name is None:
+            name = self.name
+
+        async def pool_provider():
+            await self.start()
+            yield self
+            await self.close()
+
+        async def resource_provider():
+            resource = await self.acquire()
+            yield resource
+            await self.release(resource)
+
+        provider(pool_provider, name=f"{name}_pool", scope="app")
+        provider(resource_provider, name=name)
+
+    def stats(self) -> PoolStats:
+        """Return metrics about the pool."""
+        return PoolStats(
+            name=self.name,
+            max_size=self.max_size,
+            size=self._size,
+            idle=len(self._idle),
+            in_use=self._in_use,
+            waiting=sum(not waiter.done() for waiter in self._waiters),
+            acquired=self._acquired,
+            timeouts=self._timeouts,
+            discarded=self._discarded,
+            wait_time=self._wait_time,
+            max_wait_time=self._max_wait_time,
+            utilization=self._in_use / self.max_size,
+        )
+
+
+class Lease:
+    """An async context manager that checks out a resource from a pool.
+
+    The resource is released when the `async with` block exits. It is
+    discarded if an exception was raised within the block.
+
+    # Parameters
+    pool (Pool): a #::bocadillo.pools#Pool.
+    """
+
+    __slots__ = ("pool", "_resource")
+
+    def __init__(self, pool: Pool):
+        self.pool = pool
+        self._resource: Any = None
+
+    async def __aenter__(self) -> Any:
+        self._resource = await self.pool.acquire()
+        return self._resource
+
+    async def __aexit__(self, exc_type, exc, tb):
+        resource, self._resource = self._resource, None
+        await self.pool.release(resource, discard=exc_type is not None)
@@ -1,6 +1,14 @@
 from typing import Sequence
 
+from .app_types import HTTPApp
 from .applications import App
+from .errors import HTTPErrorMiddleware
+from .middleware import compile_middleware
+from .redirection import Redirection
+from .request import Request
+from .response import Response
+from .routing import HTTPRoute, WebSocketRoute
+from .views import View
 
 
 class RecipeBase:
@@ -10,7 +18,7 @@ class RecipeBase:
         assert prefix.startswith("/"), "recipe prefix must start with '/'"
         self.prefix = prefix
 
-    def apply(self, app: App, root: str = ""):
+    def apply(self, app: App, root: str = "", flatten: bool = False):
         """Apply the recipe to an application.
 
         Should be implemented by subclasses.
@@ -18,10 +26,62 @@ class RecipeBase:
         # Parameters
         app: an #::bocadillo.applications#App instance.
         root (str): a root URL path.
+        flatten (bool):
+            whether to merge routes into the application's routers instead
+            of mounting the recipe.
         """
         raise NotImplementedError
 
 
+class RecipeRoute(HTTPRoute):
+    """An HTTP route merged from a recipe into an application.
+
+    Subclass of #::bocadillo.routing#HTTPRoute.
+
+    Requests are processed by the recipe's error handlers and HTTP middleware
+    before reaching the view.
+
+    # Parameters
+    pattern (str): an URL pattern, including the recipe's prefix.
+    view: a #::bocadillo.views#View object.
+    name (str): the route's name.
+    pipeline (HTTPApp):
+        the recipe's HTTP middleware stack, shared by all its routes
+        except those selected by the recipe's scoped middleware.
+    """
+
+    __slots__ = ("pipeline",)
+
+    def __init__(self, pattern: str, view: View, name: str, pipeline: HTTPApp):
+        super().__init__(pattern, view, name)
+        self.pipeline = pipeline
+
+    async def __call__(self, req: Request, res: Response, **params):
+        # NOTE: HTTP apps only receive `(req, res)`, so the route and its
+        # parameters are passed along in the ASGI scope (which Starlette 0.11
+        # only exposes as a read-only mapping).
+        scope = req._scope  # pylint: disable=protected-access
+        scope["route"] = self
+        scope["path_params"] = params
+        return await self.pipeline(req, res)
+
+
+class _RecipeEndpoint(HTTPApp):
+    # Innermost app of a flattened recipe's pipeline.
+    # Plays the role of the recipe's HTTP router, whose lookup has already
+    # been performed by the application's router.
+
+    __slots__ = ()
+
+    async def __call__(self, req: Request, res: Response) -> Response:
+        route: RecipeRoute = req["route"]
+        try:
+            await HTTPRoute.__call__(route, req, res, **req.path_params)
+        except Redirection as redirection:
+            res = redirection.response
+        return res
+
+
 class Recipe(App):
     """A grouping of capabilities that can be merged back into an application.
 
@@ -42,12 +102,78 @@ class Recipe(App):
 
         self.prefix = prefix
 
-    def _get_own_url_for(self, name: str, **kwargs) -> str:
-        return self.prefix + super()._get_own_url_for(name, **kwargs)
+    def _get_own_prefix(self) -> str:
+        return self.prefix
 
-    def apply(self, app: App, root: str = ""):
-        """Apply the recipe to an application."""
-        app.mount(prefix=root + self.prefix, app=self)
+    def apply(self, app: App, root: str = "", flatten: bool = False):
+        """Apply the recipe to an application.
+
+        By default, the recipe is mounted as a sub-application.
+
+        If `flatten` is `True`, its routes are registered on the application
+        instead, under the recipe's prefix and with names namespaced by the
+        recipe's name (e.g. `"tacos:index"`). Requests to these routes go
+        through the recipe's error handlers and HTTP middleware, but not
+        through its ASGI middleware. Other apps mounted on the recipe are
+        mounted on the application.
+
+        Note: the recipe should be fully configured before it is flattened.
+        """
+        prefix = root + self.prefix
+
+        if not flatten:
+            app.mount(prefix=prefix, app=self)
+            return
+
+        shared = self._build_pipeline()
+        namespace = self.name + ":"
+
+        for route in self.http_router.routes.values():
+            # Routes selected by scoped middleware get their own pipeline.
+            scoped = self.http_router.get_middleware(route)
+            pipeline = self._build_pipeline(scoped) if scoped else shared
+            app.http_router.add_route(
+                RecipeRoute(
+                    prefix + route.pattern,
+                    route.view,
+                    name=namespace + route.name,
+                    pipeline=pipeline,
+                )
+            )
+
+        for route in self.websocket_router.routes.values():
+            app.websocket_router.add_route(
+                WebSocketRoute(
+                    prefix + route.pattern, route.view, **route._ws_kwargs
+                )
+            )
+
+        for mount in self._mounts:
+            app.mount(
+                prefix + mount.prefix,
+                mount.app,
+                kind=mount.kind,
+                executor=mount.executor,
+            )
+
+    def _build_pipeline(self, scoped: Sequence = ()) -> HTTPApp:
+        # Rebuild the recipe's HTTP middleware stack around its routes.
+        # `scoped` middleware factories run inside the recipe's middleware,
+        # as they do when the recipe is mounted.
+        pipeline: HTTPApp = _RecipeEndpoint()
+        for factory in scoped:
+            pipeline = factory(pipeline)
+        for middleware_cls, kwargs in self._http_middleware:
+            pipeline = middleware_cls(pipeline, app=self, **kwargs)
+
+        errors = HTTPErrorMiddleware(compile_middleware(pipeline))
+        # NOTE: share the handlers (and their lookup cache) so that they stay
+        # in sync with the recipe.
+        errors._exception_handlers = (
+            self.exception_middleware._exception_handlers
+        )
+        errors._handler_cache = self.exception_middleware._handler_cache
+        return errors
 
     @classmethod
     def book(cls, *recipes: "Recipe", prefix: str) -> "RecipeBook":
@@ -71,7 +197,7 @@ class RecipeBook(RecipeBase):
         super().__init__(prefix)
         self.recipes = recipes
 
-    def apply(self, app: App, root: str = ""):
+    def apply(self, app: App, root: str = "", flatten: bool = False):
         """Apply the recipe book to an application."""
         for recipe in self.recipes:
-            recipe.apply(app, root=root + self.prefix)
+            recipe.apply(app, root=root + self.prefix, flatten=flatten)
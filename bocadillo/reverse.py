@@ -0,0 +1,72 @@
+"""Reverse routing, i.e. building URL paths out of route names."""
+
+from typing import FrozenSet, Optional
+
+from .urlparse import PARAM_RE
+
+# Incremented whenever routes or mounted apps change, in any application.
+# Reverse URL indexes built at an earlier version are stale.
+_version = 0
+
+
+def get_version() -> int:
+    """Return the current version of the routing configuration."""
+    return _version
+
+
+def bump_version() -> None:
+    """Signal that routes or mounted apps have changed."""
+    global _version  # pylint: disable=global-statement
+    _version += 1
+
+
+class URLFormat:
+    """A precompiled formatter for the URL paths of a route.
+
+    # Parameters
+    pattern (str): an URL pattern, e.g. `"/users/{pk}"`.
+    prefix (str): a path prefix, e.g. where the route's app is mounted.
+
+    # Attributes
+    params (frozenset): the names of the route parameters.
+    """
+
+    __slots__ = ("pattern", "prefix", "params", "_template")
+
+    def __init__(self, pattern: str, prefix: str = ""):
+        self.pattern = pattern
+        self.prefix = prefix
+
+        names = PARAM_RE.findall(pattern)
+        self.params: FrozenSet[str] = frozenset(filter(None, names))
+
+        # NOTE: anonymous wildcards (`{}`) have no value to be formatted with.
+        self._template: Optional[str] = (
+            None
+            if "" in names
+            else prefix.replace("{", "{{").replace("}", "}}") + pattern
+        )
+
+    def with_prefix(self, prefix: str) -> "URLFormat":
+        """Return a formatter for the same pattern with an extra prefix."""
+        return URLFormat(self.pattern, prefix=prefix + self.prefix)
+
+    def format(self, **params) -> str:
+        """Build an URL path out of route parameters.
+
+        # Raises
+        TypeError: if parameters are missing, or if the pattern contains
+        an anonymous wildcard.
+        """
+        if self._template is None:
+            raise TypeError(
+                f"cannot build an URL path for '{self.pattern}': "
+                "anonymous wildcards cannot be reversed"
+            )
+        try:
+            return self._template.format_map(params)
+        except KeyError:
+            missing = ", ".join(sorted(self.params - params.keys()))
+            raise TypeError(
+                f"missing route parameters for '{self.pattern}': {missing}"
+            ) from None
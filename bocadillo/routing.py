@@ -9,11 +9,16 @@
 """
 
 import inspect
+from collections import OrderedDict
+from types import MappingProxyType
 from typing import (
     Any,
     Callable,
     Dict,
     Generic,
+    List,
+    Mapping,
+    NamedTuple,
     NoReturn,
     Optional,
     Tuple,
@@ -25,13 +30,18 @@ from starlette.websockets import WebSocketClose
 
 from . import views
 from .app_types import HTTPApp, Receive, Scope, Send
+from .constants import ALL_HTTP_METHODS
+from .converters import get_segment_regexes
 from .errors import HTTPError
 from .injection import consumer
+from .matchers import RouteMatcher, TreeMatcher
+from .middleware import compile_middleware
 from .redirection import Redirection
 from .request import Request
+from .reverse import URLFormat, bump_version
 from .response import Response
-from .urlparse import Parser
-from .views import AsyncHandler, HandlerDoesNotExist, View
+from .urlparse import Parser, is_static, param_names, prefix_matcher
+from .views import AsyncHandler, View
 from .websockets import WebSocket, WebSocketView
 
 # Route generic types.
@@ -57,6 +67,88 @@ class RouteMatch(Generic[_R]):  # pylint: disable=unsubscriptable-object
         self.params = params
 
 
+class CacheInfo(NamedTuple):
+    """Statistics about a #::bocadillo.routing#RouteCache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+# Sentinel for paths that are not in a route cache.
+_NOT_CACHED = object()
+
+
+class RouteCache:
+    """A bounded LRU cache of URL paths to route lookup results.
+
+    Both matches and misses (i.e. `None`, for 404s) are cached.
+
+    # Parameters
+    maxsize (int): the maximum number of URL paths to remember.
+
+    # Attributes
+    hits (int): the number of lookups answered by the cache.
+    misses (int): the number of lookups that were not in the cache.
+    evictions (int):
+        the number of least recently used entries dropped to make room for
+        new ones.
+    """
+
+    __slots__ = ("maxsize", "_entries", "hits", "misses", "evictions")
+
+    def __init__(self, maxsize: int):
+        assert maxsize > 0, "maxsize must be a positive integer"
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Optional[RouteMatch]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str) -> Any:
+        """Return the cached lookup result for `path`.
+
+        If `path` is not in the cache, a sentinel object is returned instead.
+        """
+        try:
+            result = self._entries[path]
+        except KeyError:
+            self.misses += 1
+            return _NOT_CACHED
+        self._entries.move_to_end(path)
+        self.hits += 1
+        return result
+
+    def set(self, path: str, result: Optional[RouteMatch]):
+        """Store the lookup result for `path`."""
+        self._entries[path] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all entries. Statistics are kept."""
+        self._entries.clear()
+
+    def info(self) -> CacheInfo:
+        """Return statistics about the cache.
+
+        # Returns
+        info (CacheInfo):
+            a named tuple of `hits`, `misses`, `evictions`, `maxsize` and
+            `currsize`.
+        """
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            maxsize=self.maxsize,
+            currsize=len(self._entries),
+        )
+
+
 # Base classes.
 
 
@@ -65,23 +157,47 @@ class BaseRoute(Generic[_V]):
 
     This is referenced as `_R` in the rest of this module.
 
+    Route parameters annotated with a type (e.g. `pk: int`) only match
+    path segments that look like a value of this type, so that non-conforming
+    URL paths fall through to the next route (or result in a 404).
+
     # Parameters
     pattern (str): an URL pattern.
     view (_V):
         a view function or object whose actual type is defined by concrete
         routes.
+
+    # Attributes
+    url_format (URLFormat):
+        a #::bocadillo.reverse#URLFormat which builds URL paths for this route.
     """
 
-    __slots__ = ("_pattern", "_parser", "view")
+    __slots__ = ("_pattern", "_parser", "view", "url_format")
 
     def __init__(self, pattern: str, view: _V):
-        self._parser = Parser(pattern)
         self.view = view
+        param_regexes = get_segment_regexes(
+            self._get_handlers(), param_names(pattern)
+        )
+        self._parser = Parser(pattern, param_regexes=param_regexes)
+        self.url_format = URLFormat(self.pattern)
 
     @property
     def pattern(self) -> str:
         return self._parser.pattern
 
+    @property
+    def param_regexes(self) -> Dict[str, str]:
+        """Regexes of the path segments accepted by route parameters.
+
+        Parameters which accept any non-empty path segment are not included.
+        """
+        return self._parser.param_regexes
+
+    def _get_handlers(self) -> List[Callable]:
+        # Return the view's callables which receive route parameters.
+        return []
+
     def url(self, **kwargs) -> str:
         """Return the full URL path for the given route parameters.
 
@@ -93,7 +209,7 @@ class BaseRoute(Generic[_V]):
             A full URL path obtained by formatting the route pattern with
             the provided route parameters.
         """
-        return self.pattern.format(**kwargs)
+        return self.url_format.format(**kwargs)
 
     def parse(self, path: str) -> Optional[dict]:
         """Parse an URL path against the route's URL pattern.
@@ -128,25 +244,107 @@ class BaseRoute(Generic[_V]):
 class BaseRouter(Generic[_R, _V]):
     """The base router class.
 
+    # Parameters
+    matcher_class (type):
+        the #::bocadillo.matchers#RouteMatcher used to look up routes.
+        Defaults to #::bocadillo.matchers#TreeMatcher.
+    cache_size (int):
+        if given, the results of the last `cache_size` lookups of dynamic
+        routes are kept in a #::bocadillo.routing#RouteCache.
+
     # Attributes
     routes (dict):
         a mapping of URL patterns to route objects.
+    cache (RouteCache): the route cache, or `None` if disabled.
+    frozen (bool):
+        whether the router has been frozen, i.e. routes cannot be added
+        anymore.
+    static_hits (int):
+        the number of lookups resolved by the exact-match table of
+        parameter-free routes.
+    fallbacks (int):
+        the number of lookups that went through the `matcher_class`.
+        Lookups answered by the route `cache` are counted in neither
+        `static_hits` nor `fallbacks`, but in `cache.hits`.
     """
 
-    __slots__ = ("routes", "route_class")
+    __slots__ = (
+        "routes",
+        "route_class",
+        "matcher_class",
+        "cache",
+        "_matcher",
+        "_static",
+        "static_hits",
+        "fallbacks",
+        "frozen",
+    )
 
     route_class: Type[_R]
 
-    def __init__(self):
+    def __init__(
+        self, matcher_class: Type[RouteMatcher] = None, cache_size: int = None
+    ):
+        if matcher_class is None:
+            matcher_class = TreeMatcher
         self.routes: Dict[str, _R] = {}
+        self.matcher_class = matcher_class
+        self.cache: Optional[RouteCache] = (
+            RouteCache(cache_size) if cache_size else None
+        )
+        self._matcher: Optional[RouteMatcher] = None
+        self._static: Dict[str, RouteMatch[_R]] = {}
+        self.static_hits = 0
+        self.fallbacks = 0
+        self.frozen = False
 
     def _get_key(self, route: _R) -> str:
         # Return the key at which `route` should be stored internally.
         raise NotImplementedError
 
     def add_route(self, route: _R) -> None:
-        """Register a route."""
+        """Register a route.
+
+        # Raises
+        RuntimeError: if the router is frozen.
+        """
+        if self.frozen:
+            raise RuntimeError("cannot add a route to a frozen router")
         self.routes[self._get_key(route)] = route
+        self.invalidate()
+
+    def freeze(self) -> None:
+        """Build lookup structures and prevent routes from being added."""
+        if self._matcher is None:
+            self._build()
+        self.frozen = True
+
+    def invalidate(self) -> None:
+        """Discard lookup structures and cached lookup results.
+
+        They are rebuilt on the next lookup.
+        """
+        self._matcher = None
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _build(self) -> RouteMatcher:
+        matcher = self.matcher_class(self.routes.values())
+
+        # Resolve parameter-free patterns in advance.
+        # NOTE: the result comes from the matcher so that a route registered
+        # earlier (e.g. `/{name}`) still wins over a static one (`/about`).
+        static: Dict[str, RouteMatch[_R]] = {}
+        for route in self.routes.values():
+            if route.pattern in static or not is_static(route.pattern):
+                continue
+            found = matcher.match(route.pattern)
+            assert found is not None
+            static[route.pattern] = RouteMatch(route=found[0], params=found[1])
+
+        self._static = static
+        self._matcher = matcher
+        return matcher
 
     def route(self, *args, **kwargs) -> Callable[[Any], _R]:
         """Register a route by decorating a view.
@@ -178,11 +376,29 @@ class BaseRouter(Generic[_R, _V]):
             a #::bocadillo.routing#RouteMatch object if the path matched
             a registered route, `None` otherwise.
         """
-        for route in self.routes.values():
-            params = route.parse(path)
-            if params is not None:
-                return RouteMatch(route=route, params=params)
-        return None
+        matcher = self._matcher
+        if matcher is None:
+            matcher = self._build()
+
+        match = self._static.get(path)
+        if match is not None:
+            self.static_hits += 1
+            return match
+
+        cache = self.cache
+        if cache is not None:
+            match = cache.get(path)
+            if match is not _NOT_CACHED:
+                return match
+
+        self.fallbacks += 1
+        found = matcher.match(path)
+        match = None if found is None else RouteMatch(*found)
+
+        if cache is not None:
+            cache.set(path, match)
+
+        return match
 
 
 # HTTP.
@@ -200,13 +416,21 @@ class HTTPRoute(BaseRoute[View]):
         a #::bocadillo.views#View object.
     name (str):
         the route's name.
+
+    # Attributes
+    middleware (HTTPApp):
+        the pipeline of scoped HTTP middleware that requests to this route
+        go through, or `None` if there is none.
+        Compiled by the #::bocadillo.routing#HTTPRouter.
     """
 
-    __slots__ = ("name",)
+    __slots__ = ("name", "middleware", "_handlers", "_default", "_allow")
 
     def __init__(self, pattern: str, view: View, name: str):
         super().__init__(pattern, view)
         self.name = name
+        self.middleware: Optional[HTTPApp] = None
+        self._build_dispatch()
 
     @classmethod
     def normalize(cls, view: Any) -> View:
@@ -274,40 +498,191 @@ class HTTPRoute(BaseRoute[View]):
 
         return super().build(view=view, pattern=pattern, name=name)
 
+    def _get_handlers(self) -> List[Callable]:
+        handle = getattr(self.view, "handle", None)
+        if handle is not None:
+            return [handle]
+        handlers = (
+            getattr(self.view, method.lower(), None)
+            for method in ALL_HTTP_METHODS
+        )
+        return [handler for handler in handlers if handler is not None]
+
+    def _build_dispatch(self) -> None:
+        # Map HTTP methods to handlers once and for all, so that dispatching
+        # a request is a single dict lookup.
+        handlers: Dict[str, AsyncHandler] = {}
+        default: Optional[AsyncHandler] = getattr(self.view, "handle", None)
+
+        for method in ALL_HTTP_METHODS:
+            handler = default or getattr(self.view, method.lower(), None)
+            if handler is not None:
+                handlers[method] = handler
+
+        if "OPTIONS" not in handlers:
+            handlers["OPTIONS"] = self._options
+
+        self._handlers: Mapping[str, AsyncHandler] = MappingProxyType(handlers)
+        self._default = default
+        self._allow = ", ".join(handlers)
+
+    async def _options(self, req: Request, res: Response, **params):
+        # Automatic reply to `OPTIONS` requests.
+        res.headers["allow"] = self._allow
+
     async def __call__(self, req: Request, res: Response, **params):
-        method: str = req.method.lower()
+        handler = self._handlers.get(req.method, self._default)
 
-        try:
-            handler: AsyncHandler = self.view.get_handler(method)
-        except HandlerDoesNotExist as e:
-            raise HTTPError(405) from e
+        if handler is None:
+            res.headers["allow"] = self._allow
+            raise HTTPError(405)
 
         await handler(req, res, **params)  # type: ignore
 
 
+RouteFilter = Callable[[HTTPRoute], bool]
+MiddlewareFactory = Callable[[HTTPApp], HTTPApp]
+
+
+def route_filter(only: Any) -> RouteFilter:
+    """Build a predicate that selects HTTP routes.
+
+    # Parameters
+    only:
+        either a path prefix (e.g. `"/api"`), which selects routes whose
+        URL pattern is located under it, a collection of route names
+        (e.g. `{"login", "logout"}`), or a callable that receives an
+        #::bocadillo.routing#HTTPRoute and returns whether to select it.
+
+    # Returns
+    when (callable): a route predicate.
+    """
+    if isinstance(only, str):
+        matches = prefix_matcher(only)
+        return lambda route: matches(route.pattern)
+
+    if callable(only):
+        return only
+
+    names = frozenset(only)
+    return lambda route: route.name in names
+
+
+class _RouteEndpoint(HTTPApp):
+    # Innermost app of a route's pipeline of scoped middleware.
+
+    __slots__ = ("route",)
+
+    def __init__(self, route: HTTPRoute):
+        self.route = route
+
+    async def __call__(self, req: Request, res: Response) -> Response:
+        try:
+            res = await self.route(req, res, **req.path_params) or res
+        except Redirection as redirection:
+            res = redirection.response
+        return res
+
+
 class HTTPRouter(HTTPApp, BaseRouter[HTTPRoute, View]):
     """A router for HTTP routes.
 
     Subclass of #::bocadillo.routing#BaseRouter.
 
     Note: routes are stored by `name` instead of `pattern`.
+
+    # Attributes
+    middleware (list):
+        scoped HTTP middleware, as `(factory, when)` tuples where `factory`
+        builds a middleware from its inner HTTP app and `when` is a
+        route predicate. See [.add_middleware()](#add-middleware).
     """
 
+    __slots__ = ("middleware",)
+
     route_class = HTTPRoute
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.middleware: List[Tuple[MiddlewareFactory, RouteFilter]] = []
+
     def _get_key(self, route: HTTPRoute) -> str:
         # NOTE: this ensures that no two routes stored in this
         # router have the same name.
         return route.name
 
+    def add_route(self, route: HTTPRoute) -> None:
+        super().add_route(route)
+        # NOTE: reverse URL indexes may now be stale.
+        bump_version()
+
+    def add_middleware(
+        self, factory: MiddlewareFactory, when: RouteFilter
+    ) -> None:
+        """Register a middleware that only applies to some routes.
+
+        Routes are selected when the lookup structures are built, and the
+        selected middleware are compiled into a pipeline stored on each
+        route (see #::bocadillo.routing#HTTPRoute). Picking middleware for
+        a request has no cost beyond the route lookup itself.
+
+        # Parameters
+        factory (callable):
+            builds the middleware from its inner HTTP app, e.g.
+            a #::bocadillo.middleware#Middleware class.
+        when (callable):
+            a route predicate, e.g. built by
+            #::bocadillo.routing#route_filter.
+
+        # Raises
+        RuntimeError: if the router is frozen.
+        """
+        if self.frozen:
+            raise RuntimeError("cannot add middleware to a frozen router")
+        self.middleware.append((factory, when))
+        self.invalidate()
+
+    def get_middleware(self, route: HTTPRoute) -> List[MiddlewareFactory]:
+        """Return the factories of scoped middleware that apply to a route.
+
+        Factories are returned in registration order, i.e. innermost first.
+        """
+        return [factory for factory, when in self.middleware if when(route)]
+
+    def _build(self) -> RouteMatcher:
+        matcher = super()._build()
+
+        for route in self.routes.values():
+            endpoint = _RouteEndpoint(route)
+            pipeline: HTTPApp = endpoint
+            for factory in self.get_middleware(route):
+                pipeline = factory(pipeline)
+            pipeline = compile_middleware(pipeline)
+            route.middleware = None if pipeline is endpoint else pipeline
+
+        return matcher
+
     async def __call__(self, req: Request, res: Response) -> Response:
         match = self.match(req.url.path)
 
         if match is None:
             raise HTTPError(status=404)
 
+        route = match.route
+        pipeline = route.middleware
+
         try:
-            await match.route(req, res, **match.params)
+            if pipeline is None:
+                # NOTE: routes may return a different response object,
+                # e.g. when they run a pipeline of middleware.
+                res = await route(req, res, **match.params) or res
+            else:
+                # NOTE: HTTP apps only receive `(req, res)`, so the route
+                # parameters are passed along in the ASGI scope.
+                req._scope[  # pylint: disable=protected-access
+                    "path_params"
+                ] = match.params
+                res = await pipeline(req, res)
         except Redirection as redirection:
             res = redirection.response
 
@@ -341,6 +716,9 @@ class WebSocketRoute(BaseRoute[WebSocketView]):
     def normalize(cls, view: Any) -> WebSocketView:
         return WebSocketView(view)
 
+    def _get_handlers(self) -> List[Callable]:
+        return [self.view.func]
+
     async def __call__(
         self, scope: Scope, receive: Receive, send: Send, **params
     ):
@@ -375,10 +753,19 @@ class RoutingMixin:
 
     __slots__ = ("http_router", "websocket_router")
 
-    def __init__(self, **kwargs):
+    def __init__(
+        self,
+        matcher_class: Type[RouteMatcher] = None,
+        route_cache_size: int = None,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
-        self.http_router = HTTPRouter()
-        self.websocket_router = WebSocketRouter()
+        self.http_router = HTTPRouter(
+            matcher_class=matcher_class, cache_size=route_cache_size
+        )
+        self.websocket_router = WebSocketRouter(
+            matcher_class=matcher_class, cache_size=route_cache_size
+        )
 
     def route(self, pattern: str, *, name: str = None, namespace: str = None):
         """Register a new route by decorating a view.
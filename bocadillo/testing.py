@@ -1,3 +1,4 @@
+import asyncio
 import os
 import random
 from multiprocessing import Event, Process
@@ -14,6 +15,9 @@ except ImportError:  # pragma: no cover
 if TYPE_CHECKING:
     from .applications import App
 
+# Event loops that live server processes inherited from the parent process.
+_inherited_loops: list = []
+
 
 def create_client(app: "App", **kwargs) -> TestClient:
     """Create a [Starlette Test Client][client] out of an application.
@@ -92,6 +96,13 @@ class LiveServer:
         ready = Event()
 
         def target():
+            # NOTE: the forked process inherits the parent's event loop, whose
+            # selector is shared with the parent process. Keep it alive:
+            # closing it (e.g. when it is garbage collected once Uvicorn has
+            # set up a new loop) would unregister the parent's file
+            # descriptors, and the parent's loop would stop waking up.
+            _inherited_loops.append(asyncio.get_event_loop())
+
             async def callback_notify():
                 # Run periodically by the Uvicorn server.
                 ready.set()
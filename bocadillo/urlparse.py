@@ -1,11 +1,48 @@
 import re
-from typing import Optional, Pattern, Tuple
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
 
 PARAM_RE = re.compile(r"{}|{([a-zA-Z_:][a-zA-Z0-9_:]*)}")
 WILDCARD = "{}"
 
+# Characters that make a static pattern segment behave as a regular
+# expression rather than as a literal string.
+_REGEX_CHARS = frozenset(".^$*+?{}[]\\|()")
 
-def compile_path(pattern: str) -> Tuple[Pattern, str]:
+# Segment kinds, as returned by `split_pattern()`.
+STATIC = "static"
+PARAM = "param"
+CATCHALL = "catchall"
+COMPLEX = "complex"
+
+
+# Matches any non-empty path segment.
+SEGMENT_REGEX = r"[^/]+"
+
+
+def compile_path(
+    pattern: str, param_regexes: Dict[str, str] = None
+) -> Tuple[Pattern, str]:
+    regex, path_format = path_to_regex(pattern, param_regexes=param_regexes)
+    return re.compile(regex), path_format
+
+
+def path_to_regex(
+    pattern: str, group_prefix: str = "", param_regexes: Dict[str, str] = None
+) -> Tuple[str, str]:
+    """Return the regex source and path format for an URL pattern.
+
+    # Parameters
+    pattern (str): an URL pattern.
+    group_prefix (str):
+        prepended to the name of regex groups, e.g. to combine
+        several patterns in a single regex.
+    param_regexes (dict):
+        maps route parameters to the regex their path segment must match.
+        Regexes must not contain capturing groups.
+        Defaults to `SEGMENT_REGEX` for every parameter.
+    """
+    if param_regexes is None:
+        param_regexes = {}
     regex = "^"
     path_format = ""
     idx = 0
@@ -20,7 +57,11 @@ def compile_path(pattern: str) -> Tuple[Pattern, str]:
             )
 
         regex += pattern[idx : match.start()]
-        expr = r".+" if not name else rf"?P<{name}>[^/]+"
+        if name:
+            segment = param_regexes.get(name, SEGMENT_REGEX)
+            expr = rf"?P<{group_prefix}{name}>{segment}"
+        else:
+            expr = r".+"
         regex += rf"({expr})"
 
         path_format += pattern[idx : match.start()]
@@ -28,17 +69,75 @@ def compile_path(pattern: str) -> Tuple[Pattern, str]:
 
         idx = match.end()
 
-    regex += pattern[idx:] + "$"
+    # NOTE: `\Z` rather than `$`, which would also match before a trailing
+    # newline (e.g. `/about%0A`).
+    regex += pattern[idx:] + r"\Z"
     path_format += pattern[idx:]
 
-    return re.compile(regex), path_format
+    return regex, path_format
+
+
+def param_names(pattern: str) -> List[str]:
+    """Return the names of the route parameters of an URL pattern."""
+    return [name for name in PARAM_RE.findall(pattern) if name]
+
+
+def split_pattern(pattern: str) -> List[Tuple[str, str]]:
+    """Split a path format into `(kind, value)` segments.
+
+    Segments are delimited by `/`, in the same way `str.split("/")` does.
+    The `kind` tells how a segment can be matched without regular expressions:
+
+    - `STATIC`: the segment must be equal to `value`.
+    - `PARAM`: any non-empty segment matches (unless the parameter is given
+    a regex, see `path_to_regex()`), and is stored under `value`.
+    - `CATCHALL`: an unnamed wildcard which matches the rest of the path.
+    Only ever found in last position.
+    - `COMPLEX`: the segment can only be matched by the pattern's regex.
+    """
+    parts = pattern.split("/")
+    segments: List[Tuple[str, str]] = []
+
+    for index, part in enumerate(parts):
+        if part == WILDCARD and index == len(parts) - 1 and index > 0:
+            segments.append((CATCHALL, ""))
+            continue
+
+        match = PARAM_RE.fullmatch(part)
+        if match is not None and match.group(1):
+            segments.append((PARAM, match.group(1)))
+        elif _REGEX_CHARS.isdisjoint(part):
+            segments.append((STATIC, part))
+        else:
+            segments.append((COMPLEX, part))
+
+    return segments
+
+
+def is_static(pattern: str) -> bool:
+    """Return whether a path format only matches itself."""
+    return all(kind == STATIC for kind, _ in split_pattern(pattern))
+
+
+def prefix_matcher(prefix: str) -> Callable[[str], bool]:
+    """Build a function telling whether a path is located under a prefix.
+
+    Prefixes match whole segments, e.g. `/api` matches `/api` and
+    `/api/items`, but not `/apis`. URL patterns can be tested as well.
+    """
+    root = prefix.rstrip("/")
+    if not root:
+        return lambda path: True
+    start = root + "/"
+    return lambda path: path == root or path.startswith(start)
 
 
 class Parser:
-    def __init__(self, pattern: str):
+    def __init__(self, pattern: str, param_regexes: Dict[str, str] = None):
         if pattern != WILDCARD and not pattern.startswith("/"):
             pattern = f"/{pattern}"
-        self.regex, self.pattern = compile_path(pattern)
+        self.param_regexes = param_regexes or {}
+        self.regex, self.pattern = compile_path(pattern, self.param_regexes)
 
     def parse(self, value: str) -> Optional[dict]:
         match = self.regex.match(value)
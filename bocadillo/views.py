@@ -4,18 +4,19 @@ from typing import Any, cast, Dict, List, Optional, Type, Union
 
 from . import injection
 from .app_types import AsyncHandler, Handler
-from .compat import call_async, camel_to_snake
+from .compat import call_async, camel_to_snake, inline as mark_inline
 from .constants import ALL_HTTP_METHODS
-from .converters import ViewConverter, convert_arguments
+from .converters import (
+    ViewConverter,
+    convert_arguments,
+    get_body_converter,
+    inject_body,
+)
+from .executors import Executor
 
 MethodsParam = Union[List[str], all]  # type: ignore
 
 
-class HandlerDoesNotExist(Exception):
-    # Raised to signal that no handler exists for a requested HTTP method.
-    pass
-
-
 class HTTPConverter(ViewConverter):
     def get_query_params(self, args, kwargs):
         req = args[0]
@@ -49,10 +50,14 @@ class View:
 
     # Attributes
     name (str): the name of the view.
+    executor:
+        the #::bocadillo.executors#Executor that synchronous handlers are
+        run in. Defaults to `None`, i.e. Starlette's thread pool.
     """
 
     __slots__ = (
         "name",
+        "executor",
         "get",
         "post",
         "put",
@@ -65,6 +70,7 @@ class View:
 
     def __init__(self, name: str):
         self.name = name
+        self.executor: Optional[Executor] = None
 
     get: AsyncHandler
     post: AsyncHandler
@@ -75,22 +81,30 @@ class View:
     options: AsyncHandler
     handle: AsyncHandler
 
-    @staticmethod
-    def _to_all_async(handlers: Dict[str, Handler]) -> Dict[str, AsyncHandler]:
-        async_handlers: Dict[str, AsyncHandler] = {}
+    def _to_async(self, handler: Handler) -> AsyncHandler:
+        if inspect.iscoroutinefunction(handler):
+            return cast(AsyncHandler, handler)
 
-        for method, handler in handlers.items():
-            if not inspect.iscoroutinefunction(handler):
-                handler = wraps(handler)(partial(call_async, handler))
-            async_handlers[method] = cast(AsyncHandler, handler)
+        @wraps(handler)
+        async def run_sync(*args, **kwargs):
+            # NOTE: the executor is looked up on each call, as it may be
+            # assigned after the view was created.
+            return await call_async(
+                handler, *args, sync=True, executor=self.executor, **kwargs
+            )
 
-        return async_handlers
+        return run_sync
 
     @classmethod
     def create(
         cls: Type["View"], name: str, handlers: Dict[str, Handler]
     ) -> "View":
-        async_handlers: Dict[str, AsyncHandler] = cls._to_all_async(handlers)
+        vue: View = cls(name)
+
+        async_handlers: Dict[str, AsyncHandler] = {
+            method: vue._to_async(handler)
+            for method, handler in handlers.items()
+        }
 
         copy_get_to_head = (
             "get" in async_handlers and "head" not in async_handlers
@@ -98,26 +112,22 @@ class View:
         if copy_get_to_head:
             async_handlers["head"] = async_handlers["get"]
 
-        vue: View = cls(name)
-
         for method, handler in async_handlers.items():
+            body_converter = get_body_converter(handler)
             handler = convert_arguments(handler, converter_class=HTTPConverter)
             handler = injection.consumer(handler)
+            if body_converter is not None:
+                # NOTE: pass the body before providers are resolved, so that
+                # it is injected at the right position.
+                handler = inject_body(handler, body_converter)
             setattr(vue, method, handler)
 
         return vue
 
-    def get_handler(self, method: str) -> AsyncHandler:
-        try:
-            return getattr(self, "handle")
-        except AttributeError:
-            try:
-                return getattr(self, method)
-            except AttributeError as exc:
-                raise HandlerDoesNotExist from exc
-
 
-def from_handler(handler: Handler, methods: MethodsParam = None) -> View:
+def from_handler(
+    handler: Handler, methods: MethodsParam = None, inline: bool = False
+) -> View:
     """Convert a handler to a #::bocadillo.views#View instance.
 
     # Parameters
@@ -129,6 +139,10 @@ def from_handler(handler: Handler, methods: MethodsParam = None) -> View:
     methods (list of str):
         A list of supported HTTP methods. The `all` built-in can be used
         to support all HTTP methods. Defaults to `["get"]`.
+    inline (bool):
+        if `True`, a synchronous `handler` is called directly on the event
+        loop instead of in the thread pool.
+        See also #::bocadillo.compat#inline.
 
     # Returns
     view: a #::bocadillo.views#View instance.
@@ -136,6 +150,8 @@ def from_handler(handler: Handler, methods: MethodsParam = None) -> View:
     # See Also
     - The [constants](./constants.md) module for the list of all HTTP methods.
     """
+    if inline:
+        handler = mark_inline(handler)
     if methods is None:
         methods = ["get"]
     if methods is all:
@@ -184,9 +200,9 @@ def get_handlers(obj: Any) -> Dict[str, Handler]:
         return {method: handle for method in all_methods}
 
 
-def view(methods: MethodsParam = None):
+def view(methods: MethodsParam = None, inline: bool = False):
     """Convert the decorated function to a proper #::bocadillo.views#View.
 
     This decorator is a shortcut for [from_handler](#from-handler).
     """
-    return partial(from_handler, methods=methods)
+    return partial(from_handler, methods=methods, inline=inline)
@@ -187,6 +187,7 @@ module.exports = {
             "scopes",
             "async",
             "yield",
+            "pools",
             "modularity",
             "factory",
             "auto"
@@ -0,0 +1,99 @@
+import pytest
+
+from bocadillo import App
+from bocadillo.asgi import ASGI2Adapter, ASGI3Adapter, to_asgi2, to_asgi3
+
+
+def get_scope(path: str = "/") -> dict:
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+    }
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+@pytest.fixture
+def hello(app: App) -> App:
+    @app.route("/")
+    async def index(req, res):
+        res.text = "Hello"
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_asgi3_interface(hello: App):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await hello(get_scope(), receive, send)
+
+    assert messages[0]["status"] == 200
+    assert messages[-1]["body"] == b"Hello"
+
+
+@pytest.mark.asyncio
+async def test_asgi2_interface(hello: App):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await hello(get_scope())(receive, send)
+
+    assert messages[0]["status"] == 200
+    assert messages[-1]["body"] == b"Hello"
+
+
+@pytest.mark.asyncio
+async def test_lifespan_asgi3_interface(app: App):
+    started = False
+
+    @app.on("startup")
+    async def startup():
+        nonlocal started
+        started = True
+
+    events = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    messages = []
+
+    async def receive():
+        return events.pop(0)
+
+    async def send(message):
+        messages.append(message["type"])
+
+    await app({"type": "lifespan"}, receive, send)
+
+    assert started
+    assert messages == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
+
+
+def test_adapters_unwrap_each_other():
+    async def asgi3(scope, receive, send):
+        pass
+
+    adapter = to_asgi2(asgi3)
+    assert isinstance(adapter, ASGI2Adapter)
+    assert to_asgi3(adapter) is asgi3
+
+    def asgi2(scope):
+        pass
+
+    adapter = to_asgi3(asgi2)
+    assert isinstance(adapter, ASGI3Adapter)
+    assert to_asgi2(adapter) is asgi2
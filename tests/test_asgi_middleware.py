@@ -1,6 +1,7 @@
 import pytest
 
 from bocadillo import App, ASGIMiddleware
+from bocadillo.asgi import ASGI3Adapter
 from bocadillo.testing import create_client
 
 
@@ -60,6 +61,53 @@ def test_pure_asgi_middleware(app: App, client):
     assert called
 
 
+def test_asgi3_middleware_is_not_wrapped(app: App, client):
+    class Middleware(ASGIMiddleware):
+        async def __call__(self, scope, receive, send):
+            scope["x-value"] = "foo"
+            await super().__call__(scope, receive, send)
+
+    class PureMiddleware:
+        def __init__(self, inner):
+            self.inner = inner
+
+        async def __call__(self, scope, receive, send):
+            scope["x-other"] = "bar"
+            await self.inner(scope, receive, send)
+
+    app.add_asgi_middleware(Middleware)
+    app.add_asgi_middleware(PureMiddleware)
+    assert isinstance(app.asgi, PureMiddleware)
+    assert isinstance(app.asgi.inner, Middleware)
+
+    @app.route("/")
+    async def index(req, res):
+        res.text = req["x-value"] + req["x-other"]
+
+    assert client.get("/").text == "foobar"
+
+
+def test_consecutive_legacy_middleware_share_adapters(app: App, client):
+    class Legacy:
+        def __init__(self, inner):
+            self.inner = inner
+
+        def __call__(self, scope):
+            scope["x-count"] = scope.get("x-count", 0) + 1
+            return self.inner(scope)
+
+    app.add_asgi_middleware(Legacy)
+    app.add_asgi_middleware(Legacy)
+    assert isinstance(app.asgi, ASGI3Adapter)
+    assert isinstance(app.asgi.app.inner, Legacy)
+
+    @app.route("/")
+    async def index(req, res):
+        res.text = str(req["x-count"])
+
+    assert client.get("/").text == "2"
+
+
 @pytest.mark.parametrize(
     ["route", "origin", "expected", "expected_body"],
     [
@@ -104,3 +152,34 @@ def test_middleware_called_if_routed_to_sub_app(
     else:  # allowed origin -> allow-origin header"
         assert "access-control-allow-origin" in res.headers
         assert res.headers.get("access-control-allow-origin") == expected
+
+
+@pytest.mark.parametrize(
+    "only", ["/api", lambda scope: scope["path"].startswith("/api/")]
+)
+def test_scoped_asgi_middleware(app: App, client, only):
+    paths = []
+
+    class Middleware(ASGIMiddleware):
+        async def __call__(self, scope, receive, send):
+            paths.append(scope["path"])
+            await super().__call__(scope, receive, send)
+
+    app.add_asgi_middleware(Middleware, only=only)
+
+    @app.route("/api/items")
+    async def items(req, res):
+        pass
+
+    @app.route("/apis")
+    async def apis(req, res):
+        pass
+
+    assert client.get("/apis").status_code == 200
+    assert client.get("/api/items").status_code == 200
+    assert paths == ["/api/items"]
+
+
+def test_asgi_middleware_cannot_be_scoped_by_route_name(app: App):
+    with pytest.raises(TypeError):
+        app.add_asgi_middleware(ASGIMiddleware, only={"index"})
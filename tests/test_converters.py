@@ -1,10 +1,13 @@
-from typing import Type, Any
+from datetime import date
+from typing import Any, List, Set, Tuple, Type
+from uuid import UUID
 
 import pytest
 import typesystem
 
-from bocadillo import HTTPError
+from bocadillo import HTTPError, WebSocketDisconnect
 from bocadillo.testing import create_client
+from bocadillo.converters import MAX_QUERY_LIST_ITEMS, convert_arguments
 from bocadillo.error_handlers import error_to_media
 
 
@@ -61,55 +64,93 @@ def test_convert_route_parameters(
     assert json["value"] == converted_value
 
 
-def setup_http_error_handler(app):
-    app.add_error_handler(HTTPError, error_to_media)
-
-
-def setup_websocket_error_handler(app):
-    pass
-
-
 def check_http_status(client, url):
     r = client.get(url)
-    assert r.status_code == 400
-    return r
+    assert r.status_code == 404
 
 
 def check_websocket_status(client, url):
-    with client.websocket_connect(url) as ws:
-        message = ws.receive()
-        assert message["code"] == 403
+    with pytest.raises(WebSocketDisconnect) as ctx:
+        with client.websocket_connect(url):
+            pass
+    assert ctx.value.code == 403
 
 
 @pytest.mark.parametrize(
-    "setup, setup_error_handler, check_status",
+    "setup, check_status",
     [
-        (setup_http, setup_http_error_handler, check_http_status),
-        (
-            setup_websocket,
-            setup_websocket_error_handler,
-            check_websocket_status,
-        ),
+        (setup_http, check_http_status),
+        (setup_websocket, check_websocket_status),
     ],
 )
 @pytest.mark.parametrize(
     "annotation, string_value",
-    [(int, "a1"), (float, "foo"), (bool, "12"), (bool, "yes"), (bool, "no")],
+    [
+        (int, "a1"),
+        (int, "inf"),
+        (float, "foo"),
+        (bool, "12"),
+        (bool, "yes"),
+        (bool, "no"),
+        (date, "2019-01"),
+        (UUID, "not-a-uuid"),
+    ],
 )
-def test_if_invalid_route_parameter_then_error_response(
-    app,
-    setup,
-    setup_error_handler,
-    check_status,
-    annotation: Type,
-    string_value: str,
+def test_if_invalid_route_parameter_then_route_does_not_match(
+    app, setup, check_status, annotation: Type, string_value: str
 ):
-    setup_error_handler(app)
     setup(app, annotation)
     client = create_client(app, raise_server_exceptions=False)
-    r = check_status(client, f"/{string_value}")
-    if r is not None:
-        assert "value" in r.json()["detail"]
+    check_status(client, f"/{string_value}")
+
+
+def test_if_invalid_route_parameter_then_next_route_matches(app, client):
+    @app.route("/items/{pk}")
+    async def retrieve(req, res, pk: int):
+        res.media = {"pk": pk}
+
+    @app.route("/items/{slug}")
+    async def retrieve_by_slug(req, res, slug: str):
+        res.media = {"slug": slug}
+
+    assert client.get("/items/42").json() == {"pk": 42}
+    assert client.get("/items/hello").json() == {"slug": "hello"}
+
+
+def test_route_parameter_validation_errors_are_reported(app):
+    app.add_error_handler(HTTPError, error_to_media)
+
+    @app.route("/{value}")
+    async def index(req, res, value: typesystem.Integer(maximum=10)):
+        pass
+
+    client = create_client(app, raise_server_exceptions=False)
+    r = client.get("/12")
+    assert r.status_code == 400
+    assert "value" in r.json()["detail"]
+
+
+@pytest.mark.parametrize(
+    "annotation, string_value, converted_value",
+    [
+        (date, "2019-01-02", date(2019, 1, 2)),
+        (
+            UUID,
+            "12345678-1234-5678-9234-567812345678",
+            UUID("12345678-1234-5678-9234-567812345678"),
+        ),
+    ],
+)
+def test_convert_route_parameters_to_objects(
+    app, client, annotation: Type, string_value: str, converted_value: Any
+):
+    @app.route("/{value}")
+    async def index(req, res, value: annotation):
+        assert value == converted_value
+        res.text = "OK"
+
+    r = client.get(f"/{string_value}")
+    assert r.status_code == 200
 
 
 def test_typesystem_converter(app, client):
@@ -172,6 +213,67 @@ def test_querystring_converter(
     assert json == result
 
 
+@pytest.mark.parametrize(
+    "setup, get_json",
+    [
+        (setup_http_query_params_route, get_http_json),
+        (setup_websocket_query_params_route, get_websocket_json),
+    ],
+)
+@pytest.mark.parametrize(
+    "annotation, querystring, result",
+    [
+        (List[int], "", None),
+        (List[int], "?value=1", [1]),
+        (List[int], "?value=1&value=2&value=1", [1, 2, 1]),
+        (Tuple[int, str], "?value=1&value=a", [1, "a"]),
+        (typesystem.Array(items=typesystem.Integer()), "?value=1", [1]),
+    ],
+)
+def test_multi_valued_query_parameters(
+    app, client, setup, get_json, annotation, querystring, result
+):
+    setup(app, annotation, None)
+    assert get_json(client, f"/{querystring}") == {"value": result}
+
+
+def test_multi_valued_query_parameters_are_converted_to_containers(app, client):
+    @app.route("/")
+    async def index(req, res, tags: Set[str] = None, ids: Tuple[int, ...] = ()):
+        assert tags == {"a", "b"}
+        assert ids == (1, 2)
+
+    assert client.get("/?tags=a&tags=b&tags=a&ids=1&ids=2").status_code == 200
+
+
+def test_multi_valued_query_parameter_errors_are_reported(app, client):
+    app.add_error_handler(HTTPError, error_to_media)
+
+    @app.route("/")
+    async def index(req, res, ids: List[int] = None):
+        pass
+
+    r = client.get("/?ids=1&ids=foo")
+    assert r.status_code == 400
+    assert r.json()["detail"] == {"ids": {"1": "Must be a number."}}
+
+
+def test_number_of_query_parameter_values_is_capped(app, client):
+    @app.route("/")
+    async def index(req, res, ids: List[int] = None):
+        pass
+
+    @app.route("/many")
+    async def many(
+        req, res, ids=typesystem.Array(typesystem.Integer(), max_items=2000)
+    ):
+        pass
+
+    querystring = "&".join(["ids=1"] * (MAX_QUERY_LIST_ITEMS + 1))
+    assert client.get(f"/?{querystring}").status_code == 400
+    assert client.get(f"/many?{querystring}").status_code == 200
+
+
 def test_specifiers_fail(app):
     with pytest.raises(TypeError) as ctx:
 
@@ -183,3 +285,19 @@ def test_specifiers_fail(app):
     error = str(ctx.value)
     assert "pk: int" in error
     assert "{pk:d}" in error
+
+
+def test_functions_without_conversions_are_not_wrapped():
+    async def index(req, res, pk, **kwargs):
+        pass
+
+    assert convert_arguments(index) is index
+
+
+@pytest.mark.asyncio
+async def test_convert_positional_and_keyword_arguments():
+    async def index(req, res, pk: int, *, limit: int = 10):
+        return pk, limit
+
+    converted = convert_arguments(index)
+    assert await converted(None, None, "1", limit="2") == (1, 2)
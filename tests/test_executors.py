@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+
+from bocadillo import App
+from bocadillo.executors import Executor, ExecutorBusy
+from bocadillo.testing import create_client
+
+
+def current_thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_sync_view_runs_in_executor():
+    app = App(executors={"reports": {"max_workers": 2}})
+
+    @app.route("/", executor="reports")
+    def index(req, res):
+        res.text = current_thread_name()
+
+    client = create_client(app)
+    assert client.get("/").text.startswith("bocadillo-reports")
+
+    stats = app.executors["reports"].stats()
+    assert stats.name == "reports"
+    assert stats.max_workers == 2
+    assert stats.completed == 1
+    assert (stats.active, stats.queued, stats.rejected) == (0, 0, 0)
+    assert stats.max_wait_time >= 0
+
+
+def test_class_based_view_runs_in_executor():
+    app = App(executors={"reports": {}})
+
+    @app.route("/", executor="reports")
+    class Index:
+        def get(self, req, res):
+            res.text = current_thread_name()
+
+    client = create_client(app)
+    assert client.get("/").text.startswith("bocadillo-reports")
+
+
+def test_other_views_use_default_thread_pool():
+    app = App(executors={"reports": {}})
+
+    @app.route("/")
+    def index(req, res):
+        res.text = current_thread_name()
+
+    client = create_client(app)
+    assert not client.get("/").text.startswith("bocadillo-reports")
+
+
+def test_wsgi_app_runs_in_executor():
+    app = App(executors={"legacy": {}})
+
+    def wsgi(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [current_thread_name().encode()]
+
+    app.mount("/legacy", wsgi, executor="legacy")
+
+    client = create_client(app)
+    assert client.get("/legacy").text.startswith("bocadillo-legacy")
+    assert app.executors["legacy"].stats().completed == 1
+
+
+def test_static_files_run_in_executor(tmpdir_factory):
+    static_dir = tmpdir_factory.mktemp("static")
+    static_dir.join("hello.txt").write("Hello")
+    app = App(
+        static_dir=str(static_dir),
+        static_executor="static",
+        executors={"static": {"max_workers": 1}},
+    )
+
+    client = create_client(app)
+    assert client.get("/static/hello.txt").text == "Hello"
+    assert app.executors["static"].stats().completed == 1
+
+
+def test_unknown_executor():
+    app = App()
+    with pytest.raises(LookupError):
+        app.route("/", executor="unknown")
+    with pytest.raises(LookupError):
+        app.mount(
+            "/legacy", lambda environ, start_response: [], executor="unknown"
+        )
+
+
+def test_executors_are_shut_down_with_the_app():
+    app = App(executors={"reports": {}})
+
+    @app.route("/", executor="reports")
+    def index(req, res):
+        pass
+
+    with create_client(app) as client:
+        client.get("/")
+        assert app.executors["reports"]._pool is not None
+
+    assert app.executors["reports"]._pool is None
+
+
+@pytest.mark.asyncio
+async def test_calls_are_rejected_when_queue_is_full():
+    executor = Executor("tiny", max_workers=1, queue_size=1)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait))
+    queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ExecutorBusy) as ctx:
+        await executor.run(lambda: None)
+    assert ctx.value.status_code == 503
+
+    stats = executor.stats()
+    assert (stats.active, stats.queued, stats.rejected) == (1, 1, 1)
+
+    release.set()
+    assert await running is True
+    assert await queued == "queued"
+    assert executor.stats().completed == 2
+    executor.shutdown()
+
+
+def test_busy_executor_results_in_503():
+    app = App(executors={"tiny": {"max_workers": 1, "queue_size": 0}})
+    executor = app.executors["tiny"]
+
+    @app.route("/", executor="tiny")
+    def index(req, res):
+        pass
+
+    # Simulate a call that occupies the only thread.
+    executor._active = 1
+    client = create_client(app)
+    assert client.get("/").status_code == 503
+    executor._active = 0
+    assert client.get("/").status_code == 200
@@ -0,0 +1,63 @@
+import pytest
+
+from bocadillo import App, Recipe
+from bocadillo.testing import create_client
+
+
+def test_app_is_frozen_on_startup(app: App, client):
+    @app.route("/")
+    async def index(req, res):
+        res.text = "OK"
+
+    assert not app.frozen
+
+    with client:
+        assert app.frozen
+        assert app.http_router.frozen
+        assert app.websocket_router.frozen
+        assert client.get("/").text == "OK"
+
+
+def test_freeze_builds_routing_structures(app: App):
+    @app.route("/items/{pk}")
+    async def item(req, res, pk):
+        pass
+
+    app.freeze()
+    assert app._url_index is not None
+
+    fallbacks = app.http_router.fallbacks
+    assert app.http_router.match("/items/1") is not None
+    assert app.http_router.fallbacks == fallbacks + 1
+
+
+def test_freeze_is_idempotent(app: App):
+    app.freeze()
+    app.freeze()
+    assert app.frozen
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda app: app.route("/")(lambda req, res: None),
+        lambda app: app.websocket_route("/")(lambda ws: None),
+        lambda app: app.mount("/sub", App()),
+        lambda app: app.add_error_handler(KeyError, lambda req, res, e: None),
+        lambda app: app.add_middleware(object),
+        lambda app: app.add_asgi_middleware(object),
+    ],
+)
+def test_cannot_mutate_frozen_app(app: App, mutate):
+    app.freeze()
+    with pytest.raises(RuntimeError):
+        mutate(app)
+
+
+def test_mounted_apps_are_frozen():
+    app = App()
+    recipe = Recipe("tacos")
+    app.recipe(recipe)
+
+    with create_client(app):
+        assert recipe.frozen
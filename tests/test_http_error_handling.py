@@ -1,3 +1,4 @@
+import asyncio
 from http import HTTPStatus
 
 import pytest
@@ -129,3 +130,93 @@ def test_http_error_status_must_be_int_or_http_status():
 
 def test_http_error_str_representation():
     assert str(HTTPError(404, detail="foo")) == "404 Not Found"
+
+
+def test_most_specific_error_handler_wins(app: App, client):
+    @app.error_handler(Exception)
+    async def on_exception(req, res, exc):
+        res.text = "Exception"
+
+    @app.error_handler(LookupError)
+    async def on_lookup_error(req, res, exc):
+        res.text = "LookupError"
+
+    @app.route("/key")
+    async def key(req, res):
+        raise KeyError("foo")
+
+    @app.route("/value")
+    async def value(req, res):
+        raise ValueError("foo")
+
+    assert client.get("/key").text == "LookupError"
+    assert client.get("/value").text == "Exception"
+
+
+def test_error_handler_lookups_are_cached(app: App, client):
+    @app.route("/")
+    async def index(req, res):
+        raise KeyError("foo")
+
+    @app.error_handler(LookupError)
+    async def on_lookup_error(req, res, exc):
+        res.text = "LookupError"
+
+    assert client.get("/").text == "LookupError"
+    cache = app.exception_middleware._handler_cache
+    assert cache[KeyError] is on_lookup_error
+
+    @app.error_handler(KeyError)
+    async def on_key_error(req, res, exc):
+        res.text = "KeyError"
+
+    assert KeyError not in cache
+    assert client.get("/").text == "KeyError"
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_isolated_between_concurrent_requests(app: App):
+    @app.route("/ok/{pk}")
+    async def ok(req, res, pk: int):
+        await asyncio.sleep(0)
+        res.text = str(pk)
+
+    @app.route("/fail/{pk}")
+    async def fail(req, res, pk: int):
+        await asyncio.sleep(0)
+        raise ValueError(pk)
+
+    async def call(path: str) -> tuple:
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            await asyncio.sleep(0)
+            messages.append(message)
+
+        try:
+            await app(scope, receive, send)
+        except ValueError as exc:
+            return messages[0]["status"], exc.args[0]
+        return messages[0]["status"], None
+
+    paths = [f"/fail/{pk}" if pk % 2 else f"/ok/{pk}" for pk in range(2000)]
+    results = await asyncio.gather(*map(call, paths))
+
+    for pk, (status, error) in enumerate(results):
+        if pk % 2:
+            assert (status, error) == (500, pk)
+        else:
+            assert (status, error) == (200, None)
@@ -4,6 +4,8 @@ from contextlib import contextmanager
 import pytest
 
 from bocadillo import App, Middleware, HTTPError
+from bocadillo.middleware import MiddlewarePipeline
+from bocadillo.testing import create_client
 
 
 @contextmanager
@@ -203,3 +205,198 @@ def test_middleware_called_if_routed_to_sub_app(app: App, client):
         r = client.get("/sub/home")
         assert r.status_code == 200
         assert r.text == "OK"
+
+
+def build_tracing_middleware(calls: list):
+    class Before(Middleware):
+        async def before_dispatch(self, req, res):
+            calls.append(("before", self.kwargs["tag"]))
+            if self.kwargs.get("stop"):
+                res.text = "Stopped"
+                return res
+
+    class After(Middleware):
+        def after_dispatch(self, req, res):
+            calls.append(("after", self.kwargs["tag"]))
+
+    class Both(Before, After):
+        pass
+
+    return Before, After, Both
+
+
+@pytest.mark.parametrize("frozen", [False, True])
+def test_compiled_middleware_behaves_like_nested_middleware(frozen: bool):
+    calls = []
+    Before, After, Both = build_tracing_middleware(calls)
+
+    app = App()
+    app.add_middleware(Both, tag="inner")
+    app.add_middleware(Middleware)
+    app.add_middleware(Both, tag="stop", stop=True)
+    app.add_middleware(After, tag="after")
+    app.add_middleware(Before, tag="before")
+    app.add_middleware(Both, tag="outer")
+
+    @app.route("/")
+    async def index(req, res):
+        calls.append("view")
+
+    if frozen:
+        app.freeze()
+
+    client = create_client(app)
+    assert client.get("/").text == "Stopped"
+    assert calls == [
+        ("before", "outer"),
+        ("before", "before"),
+        ("before", "stop"),
+        ("after", "after"),
+        ("after", "outer"),
+    ]
+
+
+def test_middleware_without_hooks_are_compiled_away():
+    calls = []
+    Before, After, Both = build_tracing_middleware(calls)
+
+    app = App()
+    app.add_middleware(Middleware)
+    app.add_middleware(Both, tag="both")
+    app.add_middleware(Middleware)
+    app.freeze()
+
+    pipeline = app.exception_middleware.app
+    assert isinstance(pipeline, MiddlewarePipeline)
+    assert len(pipeline.layers) == 1
+    assert pipeline.inner is app.http_router
+
+
+def test_middleware_overriding_call_are_kept():
+    calls = []
+    Before, After, Both = build_tracing_middleware(calls)
+
+    class Custom(Middleware):
+        async def __call__(self, req, res):
+            calls.append("custom")
+            return await self.inner(req, res)
+
+    app = App()
+    app.add_middleware(Both, tag="inner")
+    app.add_middleware(Custom)
+    app.add_middleware(Both, tag="outer")
+
+    @app.route("/")
+    async def index(req, res):
+        calls.append("view")
+
+    app.freeze()
+    pipeline = app.exception_middleware.app
+    assert isinstance(pipeline.inner, Custom)
+    assert isinstance(pipeline.inner.inner, MiddlewarePipeline)
+
+    assert create_client(app).get("/").status_code == 200
+    assert calls == [
+        ("before", "outer"),
+        "custom",
+        ("before", "inner"),
+        "view",
+        ("after", "inner"),
+        ("after", "outer"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "only",
+    [
+        "/api",
+        {"items", "item"},
+        lambda route: route.pattern.startswith("/api/"),
+    ],
+)
+def test_scoped_middleware_only_runs_for_selected_routes(only):
+    calls = []
+    Before, After, Both = build_tracing_middleware(calls)
+
+    app = App()
+    app.add_middleware(Both, only=only, tag="api")
+
+    @app.route("/api/items")
+    async def items(req, res):
+        calls.append("view")
+
+    @app.route("/api/items/{pk}")
+    async def item(req, res, pk: int):
+        res.media = {"pk": pk}
+
+    @app.route("/apis")
+    async def apis(req, res):
+        calls.append("view")
+
+    client = create_client(app)
+
+    assert client.get("/apis").status_code == 200
+    assert calls == ["view"]
+    assert app.http_router.routes["apis"].middleware is None
+
+    calls.clear()
+    assert client.get("/api/items").status_code == 200
+    assert calls == [("before", "api"), "view", ("after", "api")]
+
+    calls.clear()
+    assert client.get("/api/items/1").json() == {"pk": 1}
+    assert calls == [("before", "api"), ("after", "api")]
+
+
+def test_scoped_middleware_runs_inside_app_middleware():
+    calls = []
+    Before, After, Both = build_tracing_middleware(calls)
+
+    app = App()
+    app.add_middleware(Both, only="/", tag="scoped")
+    app.add_middleware(Both, tag="global")
+
+    @app.route("/")
+    async def index(req, res):
+        calls.append("view")
+
+    app.freeze()
+    assert create_client(app).get("/").status_code == 200
+    assert calls == [
+        ("before", "global"),
+        ("before", "scoped"),
+        "view",
+        ("after", "scoped"),
+        ("after", "global"),
+    ]
+
+
+def test_scoped_middleware_receives_redirections():
+    calls = []
+    Before, After, Both = build_tracing_middleware(calls)
+
+    app = App()
+    app.add_middleware(Both, only={"old"}, tag="old")
+
+    @app.route("/old")
+    async def old(req, res):
+        app.redirect(name="new")
+
+    @app.route("/new")
+    async def new(req, res):
+        res.text = "New"
+
+    response = create_client(app).get("/old")
+    assert response.text == "New"
+    assert calls == [("before", "old"), ("after", "old")]
+
+
+def test_scoped_middleware_applies_to_routes_added_later(app: App, client):
+    with build_middleware() as middleware:
+        app.add_middleware(middleware, only="/")
+
+        @app.route("/")
+        async def index(req, res):
+            pass
+
+        client.get("/")
@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+from typing import List
+
+import pytest
+import typesystem
+
+from bocadillo import App, HTTPError, view
+from bocadillo.converters import get_body_validator
+from bocadillo.error_handlers import error_to_media
+
+
+class Item(typesystem.Schema):
+    name = typesystem.String()
+    price = typesystem.Integer(minimum=0)
+
+
+@dataclass
+class Point:
+    x: int
+    y: int = 0
+
+
+def test_schema_body(app: App, client):
+    @app.route("/items/{pk}")
+    @view(methods=["post"])
+    async def create(req, res, item: Item, pk: int):
+        assert isinstance(item, Item)
+        res.media = {"pk": pk, "name": item.name, "price": item.price}
+
+    r = client.post("/items/1", json={"name": "Tacos", "price": "5"})
+    assert r.status_code == 200
+    assert r.json() == {"pk": 1, "name": "Tacos", "price": 5}
+
+
+def test_dataclass_body(app: App, client):
+    @app.route("/points")
+    @view(methods=["post"])
+    async def create(req, res, point: Point):
+        assert point == Point(x=1)
+
+    r = client.post("/points", json={"x": "1", "z": 2})
+    assert r.status_code == 200
+
+
+def test_array_body(app: App, client):
+    @app.route("/points")
+    @view(methods=["post"])
+    async def create(req, res, points: List[Point]):
+        res.media = [[point.x, point.y] for point in points]
+
+    r = client.post("/points", json=[{"x": 1}, {"x": 2, "y": 3}])
+    assert r.json() == [[1, 0], [2, 3]]
+
+
+@pytest.mark.parametrize(
+    "annotation, body, detail",
+    [
+        (
+            Item,
+            {"name": "Tacos", "price": -1},
+            {"price": "Must be greater than or equal to 0."},
+        ),
+        (
+            List[Point],
+            [{"x": 1}, {"y": 3}],
+            {"1": {"x": "This field is required."}},
+        ),
+        (List[Point], {"x": 1}, {"": "Must be an array."}),
+    ],
+)
+def test_validation_errors_are_reported(
+    app: App, client, annotation, body, detail
+):
+    app.add_error_handler(HTTPError, error_to_media)
+
+    @app.route("/")
+    @view(methods=["post"])
+    async def create(req, res, data: annotation):
+        pass
+
+    r = client.post("/", json=body)
+    assert r.status_code == 400
+    assert r.json()["detail"] == detail
+
+
+def test_malformed_json(app: App, client):
+    @app.route("/")
+    @view(methods=["post"])
+    async def create(req, res, item: Item):
+        pass
+
+    assert client.post("/", data="{").status_code == 400
+
+
+def test_optional_body(app: App, client):
+    @app.route("/")
+    @view(methods=["post"])
+    async def create(req, res, item: Item = None):
+        res.media = {"empty": item is None}
+
+    assert client.post("/").json() == {"empty": True}
+
+
+def test_body_is_still_available_to_the_view(app: App, client):
+    @app.route("/")
+    @view(methods=["post"])
+    async def create(req, res, item: Item):
+        res.media = await req.json()
+
+    body = {"name": "Tacos", "price": 5, "extra": True}
+    assert client.post("/", json=body).json() == body
+
+
+def test_oversized_body_is_rejected(app: App, client, monkeypatch):
+    from bocadillo import converters
+
+    monkeypatch.setattr(converters, "MAX_BODY_SIZE", 16)
+
+    @app.route("/")
+    @view(methods=["post"])
+    async def create(req, res, points: List[Point]):
+        pass
+
+    r = client.post("/", json=[{"x": index} for index in range(10)])
+    assert r.status_code == 413
+
+
+def test_validators_are_compiled_once():
+    assert get_body_validator(Item) is get_body_validator(Item)
+    assert get_body_validator(List[Item]) is get_body_validator(List[Item])
+    assert get_body_validator(int) is None
+
+
+def test_only_one_body_parameter_allowed(app: App):
+    with pytest.raises(TypeError):
+
+        @app.route("/")
+        @view(methods=["post"])
+        async def create(req, res, item: Item, point: Point):
+            pass
@@ -18,9 +18,7 @@ def test_allowed_methods(app: App, client, methods, method, status):
     assert response.status_code == status
 
 
-@pytest.mark.parametrize(
-    "method", ["post", "delete", "put", "patch", "options"]
-)
+@pytest.mark.parametrize("method", ["post", "delete", "put", "patch"])
 def test_unsafe_methods_not_supported_by_default(app: App, client, method):
     @app.route("/")
     async def index(req, res):
@@ -28,6 +26,32 @@ def test_unsafe_methods_not_supported_by_default(app: App, client, method):
 
     response = getattr(client, method)("/")
     assert response.status_code == 405
+    assert response.headers["allow"] == "GET, HEAD, OPTIONS"
+
+
+def test_options_is_answered_automatically(app: App, client):
+    @app.route("/")
+    class Index:
+        async def get(self, req, res):
+            pass
+
+        async def post(self, req, res):
+            pass
+
+    response = client.options("/")
+    assert response.status_code == 200
+    assert response.headers["allow"] == "GET, HEAD, POST, OPTIONS"
+
+
+def test_options_handler_overrides_automatic_reply(app: App, client):
+    @app.route("/")
+    class Index:
+        async def options(self, req, res):
+            res.text = "Options!"
+
+    response = client.options("/")
+    assert response.status_code == 200
+    assert response.text == "Options!"
 
 
 def test_if_get_implemented_then_head_mapped(app: App, client):
@@ -48,6 +72,17 @@ def test_if_get_in_function_view_methods_then_head_mapped(app: App, client):
     assert client.head("/").status_code == 200
 
 
+def test_if_methods_is_all_then_non_standard_methods_allowed(
+    app: App, client
+):
+    @app.route("/")
+    @view(methods=all)
+    async def index(req, res):
+        pass
+
+    assert client.request("PROPFIND", "/").status_code == 200
+
+
 def test_if_methods_is_all_then_all_methods_allowed(app: App, client):
     @app.route("/")
     @view(methods=all)
@@ -80,3 +80,70 @@ def test_cannot_reverse_unnamed_sub_app_route(app: App):
 
     with pytest.raises(HTTPError):
         app.url_for("sub:foo")
+
+
+def test_sub_app_routes_added_after_mounting_can_be_reversed(app: App):
+    sub = App("sub")
+    app.mount("/sub", sub)
+
+    with pytest.raises(HTTPError):
+        app.url_for("sub:foo")
+
+    @sub.route("/foo")
+    async def foo(req, res):
+        pass
+
+    assert app.url_for("sub:foo") == "/sub/foo"
+
+
+def test_reverse_nested_sub_app_route(app: App):
+    sub = App("sub")
+    subsub = App("subsub")
+
+    @subsub.route("/foo/{pk}")
+    async def foo(req, res, pk):
+        pass
+
+    sub.mount("/subsub", subsub)
+    app.mount("/sub", sub)
+
+    assert app.url_for("sub:subsub:foo", pk=1) == "/sub/subsub/foo/1"
+
+
+def test_url_index_is_reused(app: App):
+    @app.route("/about")
+    async def about(req, res):
+        pass
+
+    assert app.url_for("about") == "/about"
+    index = app._url_index
+    assert app.url_for("about") == "/about"
+    assert app._url_index is index
+
+
+def test_if_route_parameters_missing_then_type_error(app: App):
+    @app.route("/about/{who}/{when}")
+    async def about(req, res, who, when):
+        pass
+
+    with pytest.raises(TypeError) as ctx:
+        app.url_for("about", who="me")
+    assert "when" in str(ctx.value)
+
+
+def test_cannot_reverse_route_with_anonymous_wildcard(app: App):
+    @app.route("/files/{}")
+    async def files(req, res):
+        pass
+
+    with pytest.raises(TypeError):
+        app.url_for("files")
+
+
+def test_urls_for(app: App):
+    @app.route("/items/{pk}")
+    async def item(req, res, pk):
+        pass
+
+    urls = app.urls_for("item", [{"pk": 1}, {"pk": 2}])
+    assert urls == ["/items/1", "/items/2"]
@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+
+from bocadillo import App, provider
+from bocadillo.injection import consumer
+from bocadillo.testing import create_client
+
+
+TENANT = {"id": 1}
+
+
+@pytest.fixture(autouse=True)
+def reset_tenant():
+    TENANT["id"] = 1
+
+
+@provider
+async def cache_tenant_id():
+    return TENANT["id"]
+
+
+def build_cached_provider(name: str, **kwargs):
+    calls = []
+
+    async def settings(cache_tenant_id):
+        calls.append(cache_tenant_id)
+        await asyncio.sleep(0.01)
+        return {"tenant": cache_tenant_id}
+
+    return provider(settings, name=name, **kwargs), calls
+
+
+@pytest.mark.asyncio
+async def test_values_are_cached_per_key_until_they_expire():
+    prov, calls = build_cached_provider("cached_settings", cache=0.05)
+
+    @consumer
+    async def get(cached_settings):
+        return cached_settings
+
+    assert await get() == {"tenant": 1}
+    assert await get() == {"tenant": 1}
+    TENANT["id"] = 2
+    assert await get() == {"tenant": 2}
+    assert calls == [1, 2]
+
+    await asyncio.sleep(0.05)
+    assert await get() == {"tenant": 2}
+    assert calls == [1, 2, 2]
+
+    info = prov.func.cache.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 3, 2)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_a_single_computation():
+    prov, calls = build_cached_provider("shared_settings", cache=60)
+
+    @consumer
+    async def get(shared_settings):
+        return shared_settings
+
+    values = await asyncio.gather(*(get() for _ in range(10)))
+
+    assert values == [{"tenant": 1}] * 10
+    assert calls == [1]
+    assert prov.func.cache.info().shared == 9
+
+
+@pytest.mark.asyncio
+async def test_cancelled_callers_do_not_cancel_the_computation():
+    prov, calls = build_cached_provider("survivor_settings", cache=60)
+
+    @consumer
+    async def get(survivor_settings):
+        return survivor_settings
+
+    first = asyncio.ensure_future(get())
+    second = asyncio.ensure_future(get())
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == {"tenant": 1}
+    assert await get() == {"tenant": 1}
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_failures_are_shared_but_not_cached():
+    calls = []
+
+    @provider(cache=60)
+    async def flaky_settings():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise ValueError
+        return "OK"
+
+    @consumer
+    async def get(flaky_settings):
+        return flaky_settings
+
+    results = await asyncio.gather(get(), get(), return_exceptions=True)
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+    assert await get() == "OK"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_values_are_evicted():
+    prov, calls = build_cached_provider(
+        "bounded_settings", cache=60, cache_size=2
+    )
+
+    @consumer
+    async def get(bounded_settings):
+        return bounded_settings
+
+    for pk in (1, 2, 1, 3, 1, 2):
+        TENANT["id"] = pk
+        await get()
+
+    assert calls == [1, 2, 3, 2]
+    assert prov.func.cache.info().evictions == 2
+
+
+@pytest.mark.asyncio
+async def test_custom_cache_key():
+    prov, calls = build_cached_provider(
+        "keyed_settings", cache=60, cache_key=lambda **kwargs: "all"
+    )
+
+    @consumer
+    async def get(keyed_settings):
+        return keyed_settings
+
+    assert await get() == {"tenant": 1}
+    TENANT["id"] = 2
+    assert await get() == {"tenant": 1}
+    assert calls == [1]
+
+    prov.func.cache.clear()
+    assert await get() == {"tenant": 2}
+
+
+def test_cannot_cache_app_scoped_or_yield_providers():
+    with pytest.raises(ValueError):
+
+        @provider(scope="app", cache=60)
+        async def app_settings():
+            pass
+
+    with pytest.raises(ValueError):
+
+        @provider(cache=60)
+        async def yield_settings():
+            yield
+
+
+def test_cached_providers_are_injected_into_views(app: App):
+    calls = []
+
+    @provider(cache=60)
+    def view_settings():
+        calls.append(None)
+        return {"debug": False}
+
+    @app.route("/")
+    async def index(req, res, view_settings):
+        res.media = view_settings
+
+    client = create_client(app)
+    for _ in range(3):
+        assert client.get("/").json() == {"debug": False}
+    assert len(calls) == 1
@@ -1,6 +1,10 @@
+import asyncio
+
 import pytest
 
 from bocadillo import App, provider
+from bocadillo.injection import consumer
+from bocadillo.testing import create_client
 
 
 @pytest.fixture(autouse=True)
@@ -54,3 +58,133 @@ def test_class_based_view_with_route_parameters(app: App, client):
     r = client.get("/hi/peeps")
     assert r.status_code == 200
     assert r.text == "Hello, peeps!"
+
+
+def test_provider_declared_after_view(app: App, client):
+    @app.route("/hi")
+    async def say_hi(req, res, late_hello):
+        res.text = late_hello
+
+    @provider
+    async def late_hello():
+        return "Hello, late providers!"
+
+    r = client.get("/hi")
+    assert r.status_code == 200
+    assert r.text == "Hello, late providers!"
+
+
+@pytest.mark.asyncio
+async def test_functions_without_providers_are_called_directly():
+    async def say_hi(req, res, who):
+        return f"Hi, {who}!"
+
+    call = consumer(say_hi)(None, None, who="peeps")
+    assert call.cr_code is say_hi.__code__
+    assert await call == "Hi, peeps!"
+
+    # Unknown keyword arguments are still dropped.
+    call = consumer(say_hi)(None, None, who="peeps", pk=1)
+    assert call.cr_code is not say_hi.__code__
+    assert await call == "Hi, peeps!"
+
+
+def test_independent_providers_are_evaluated_concurrently(app: App, client):
+    active = 0
+    max_active = 0
+
+    async def fetch(value):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return value
+
+    @provider
+    async def concurrent_user():
+        return await fetch("user")
+
+    @provider
+    async def concurrent_flags():
+        return await fetch("flags")
+
+    @provider
+    async def concurrent_tenant():
+        return await fetch("tenant")
+
+    @app.route("/")
+    async def index(
+        req, res, concurrent_user, concurrent_flags, concurrent_tenant
+    ):
+        res.media = [concurrent_user, concurrent_flags, concurrent_tenant]
+
+    r = client.get("/")
+    assert r.json() == ["user", "flags", "tenant"]
+    assert max_active == 3
+
+
+def test_yield_providers_are_finalized_in_dependency_order(app: App, client):
+    events = []
+
+    @provider
+    async def ordered_db():
+        events.append("setup db")
+        yield "db"
+        events.append("teardown db")
+
+    @provider
+    async def ordered_session(ordered_db):
+        events.append("setup session")
+        yield f"session({ordered_db})"
+        events.append("teardown session")
+
+    @provider
+    async def ordered_repo(ordered_session, ordered_db):
+        yield f"repo({ordered_session}, {ordered_db})"
+        events.append("teardown repo")
+
+    @app.route("/")
+    async def index(req, res, ordered_repo, ordered_db):
+        events.append("view")
+        res.text = ordered_repo
+
+    assert client.get("/").text == "repo(session(db), db)"
+    assert events == [
+        "setup db",
+        "setup session",
+        "view",
+        "teardown repo",
+        "teardown session",
+        "teardown db",
+    ]
+
+
+def test_failing_provider_cancels_concurrent_providers(app: App):
+    events = []
+
+    @provider
+    async def failing_slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+    @provider
+    async def failing_cleaned():
+        yield "cleaned"
+        events.append("teardown")
+
+    @provider
+    async def failing_broken():
+        await asyncio.sleep(0)
+        raise ValueError("broken")
+
+    @app.route("/")
+    async def index(req, res, failing_slow, failing_cleaned, failing_broken):
+        pass
+
+    client = create_client(app, raise_server_exceptions=False)
+    assert client.get("/").status_code == 500
+    assert sorted(events) == ["cancelled", "teardown"]
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import pytest
+
+from bocadillo import App, Middleware, hooks, inline, view
+
+
+@pytest.fixture(name="loop_debug")
+def fixture_loop_debug():
+    loop = asyncio.get_event_loop()
+    debug, duration = loop.get_debug(), loop.slow_callback_duration
+    loop.set_debug(True)
+    loop.slow_callback_duration = 0
+    yield
+    loop.set_debug(debug)
+    loop.slow_callback_duration = duration
+
+
+def test_sync_views_run_in_thread_pool_by_default(app: App, client):
+    @app.route("/")
+    def index(req, res):
+        res.media = {
+            "main": threading.current_thread() is threading.main_thread()
+        }
+
+    assert client.get("/").json() == {"main": False}
+
+
+def test_inline_view(app: App, client):
+    @app.route("/")
+    @view(inline=True)
+    def index(req, res):
+        res.media = {
+            "main": threading.current_thread() is threading.main_thread()
+        }
+
+    assert client.get("/").json() == {"main": True}
+
+
+def test_inline_class_based_view(app: App, client):
+    @app.route("/")
+    class Index:
+        @inline
+        def get(self, req, res):
+            res.media = {
+                "main": threading.current_thread() is threading.main_thread()
+            }
+
+    assert client.get("/").json() == {"main": True}
+
+
+def test_inline_hooks_error_handlers_and_middleware(app: App, client):
+    threads = []
+
+    @inline
+    def track(req, res, params):
+        threads.append(threading.current_thread())
+
+    @inline
+    def handle(req, res, exc):
+        threads.append(threading.current_thread())
+        res.status_code = 418
+
+    class Tracker(Middleware):
+        @inline
+        def before_dispatch(self, req, res):
+            threads.append(threading.current_thread())
+
+    app.add_middleware(Tracker)
+    app.add_error_handler(KeyError, handle)
+
+    @app.route("/")
+    @hooks.before(track)
+    async def index(req, res):
+        raise KeyError
+
+    assert client.get("/").status_code == 418
+    assert threads == [threading.main_thread()] * 3
+
+
+def test_slow_inline_functions_are_reported_in_debug_mode(
+    app: App, client, loop_debug
+):
+    @app.route("/")
+    @view(inline=True)
+    def index(req, res):
+        pass
+
+    with pytest.warns(RuntimeWarning, match="blocked the event loop"):
+        client.get("/")
@@ -1,4 +1,5 @@
 from bocadillo import App
+from bocadillo.mounts import APP, ASGI, ASGI3, WSGI, MountIndex, get_app_kind
 
 
 def test_access_sub_route(app: App, client):
@@ -13,3 +14,139 @@ def test_access_sub_route(app: App, client):
     r = client.get("/other/foo")
     assert r.status_code == 200
     assert r.text == "OK"
+
+
+def create_app(text: str) -> App:
+    other = App()
+
+    @other.route("/")
+    async def index(req, res):
+        res.text = text
+
+    return other
+
+
+def test_longest_prefix_wins(app: App, client):
+    app.mount("/api", create_app("api"))
+    app.mount("/api/v2", create_app("v2"))
+
+    assert client.get("/api/").text == "api"
+    assert client.get("/api/v2/").text == "v2"
+
+
+def test_prefix_matches_on_segment_boundaries(app: App, client):
+    app.mount("/api", create_app("api"))
+    app.mount("/api-v2", create_app("v2"))
+
+    assert client.get("/api/").text == "api"
+    assert client.get("/api-v2/").text == "v2"
+    assert client.get("/apiv3/").status_code == 404
+
+
+def test_mount_wsgi_app(app: App, client):
+    def wsgi(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [environ["PATH_INFO"].encode()]
+
+    app.mount("/wsgi", wsgi)
+
+    r = client.get("/wsgi/foo")
+    assert r.status_code == 200
+    assert r.text == "/foo"
+
+
+def test_mount_asgi3_app(app: App, client):
+    async def asgi3(scope, receive, send):
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": []}
+        )
+        await send(
+            {"type": "http.response.body", "body": scope["path"].encode()}
+        )
+
+    app.mount("/asgi", asgi3)
+    assert app._mounts.get("/asgi").kind == ASGI3
+
+    r = client.get("/asgi/foo")
+    assert r.status_code == 200
+    assert r.text == "/foo"
+
+
+def test_get_app_kind():
+    def asgi(scope):
+        pass
+
+    def wsgi(environ, start_response):
+        pass
+
+    class ASGIClass:
+        def __init__(self, scope):
+            pass
+
+    async def asgi3(scope, receive, send):
+        pass
+
+    def wrapped(*args, **kwargs):
+        pass
+
+    assert get_app_kind(asgi) == ASGI
+    assert get_app_kind(asgi3) == ASGI3
+    assert get_app_kind(ASGIClass) == ASGI
+    assert get_app_kind(wsgi) == WSGI
+    assert get_app_kind(wrapped) is None
+
+
+def test_match():
+    index = MountIndex()
+    root, api, slash = object(), object(), object()
+    index.add("/", root)
+    index.add("/api", api)
+    index.add("/files/", slash)
+
+    assert index.match("/").app is root
+    assert index.match("/foo").app is root
+    assert index.match("/api").app is api
+    assert index.match("/api/users").app is api
+    assert index.match("/api-v2").app is root
+    assert index.match("/files/a.txt").app is slash
+    assert index.match("/files").app is root
+    assert MountIndex().match("/") is None
+
+
+def wsgi_hello(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [b"Hello"]
+
+
+def test_mount_wsgi_app_wrapped_without_functools_wraps(app: App, client):
+    def wrapper(*args, **kwargs):
+        return wsgi_hello(*args, **kwargs)
+
+    app.mount("/w", wrapper)
+    for _ in range(2):
+        r = client.get("/w/x")
+        assert r.status_code == 200
+        assert r.text == "Hello"
+    assert app._mounts.get("/w").kind == WSGI
+
+
+def test_mount_kind_can_be_given_explicitly(app: App, client):
+    def wrapper(*args, **kwargs):
+        return wsgi_hello(*args, **kwargs)
+
+    app.mount("/w", wrapper, kind="wsgi")
+    assert app._mounts.get("/w").kind == WSGI
+    assert client.get("/w/x").text == "Hello"
+
+
+def test_mounted_app_is_not_inspected(app: App):
+    app.mount("/other", App())
+    assert app._mounts.get("/other").kind == APP
+
+
+def test_mount_at_same_prefix_replaces_previous_app():
+    index = MountIndex()
+    first, second = object(), object()
+    index.add("/api", first)
+    index.add("/api/", second)
+    assert index.get("/api").app is second
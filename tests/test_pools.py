@@ -0,0 +1,170 @@
+import asyncio
+from itertools import count
+
+import pytest
+
+from bocadillo import App
+from bocadillo.pools import Pool, PoolTimeout
+from bocadillo.testing import create_client
+
+
+class Connection:
+    def __init__(self, pk: int):
+        self.pk = pk
+        self.healthy = True
+        self.closed = False
+
+
+def build_pool(**kwargs) -> Pool:
+    ids = count()
+
+    async def connect():
+        return Connection(next(ids))
+
+    async def close(connection: Connection):
+        connection.closed = True
+
+    return Pool(connect, close=close, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_resources_are_reused():
+    pool = build_pool(name="db", max_size=2)
+
+    first = await pool.acquire()
+    await pool.release(first)
+    second = await pool.acquire()
+    assert second is first
+
+    stats = pool.stats()
+    assert stats.name == "db"
+    assert (stats.size, stats.in_use, stats.idle) == (1, 1, 0)
+    assert stats.acquired == 2
+    assert stats.utilization == 0.5
+
+
+@pytest.mark.asyncio
+async def test_acquire_times_out_when_all_resources_are_in_use():
+    pool = build_pool(max_size=1, timeout=0.01)
+    await pool.acquire()
+
+    with pytest.raises(PoolTimeout) as ctx:
+        await pool.acquire()
+
+    assert ctx.value.status_code == 503
+    assert pool.stats().timeouts == 1
+    assert pool.stats().waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_released_resources_are_handed_over_to_waiting_calls():
+    pool = build_pool(max_size=1)
+    connection = await pool.acquire()
+
+    waiting = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0.01)
+    assert pool.stats().waiting == 1
+
+    await pool.release(connection)
+    assert await waiting is connection
+
+    stats = pool.stats()
+    assert (stats.size, stats.in_use, stats.waiting) == (1, 1, 0)
+    assert stats.max_wait_time >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiting_calls_do_not_leak_resources():
+    pool = build_pool(max_size=1)
+    connection = await pool.acquire()
+
+    waiting = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await pool.release(connection)
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert await pool.acquire() is connection
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_resources_are_discarded_on_checkout():
+    pool = build_pool(check=lambda connection: connection.healthy)
+
+    connection = await pool.acquire()
+    await pool.release(connection)
+    connection.healthy = False
+
+    other = await pool.acquire()
+    assert other is not connection
+    assert connection.closed
+    assert pool.stats().discarded == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_resources_are_evicted_down_to_min_size():
+    pool = build_pool(min_size=1, max_idle=0.01)
+    await pool.start()
+
+    connections = [await pool.acquire() for _ in range(3)]
+    for connection in connections:
+        await pool.release(connection)
+    await asyncio.sleep(0.02)
+
+    kept = await pool.acquire()
+    assert sum(connection.closed for connection in connections) == 2
+    assert not kept.closed
+    assert pool.stats().size == 1
+
+
+@pytest.mark.asyncio
+async def test_start_and_close():
+    pool = build_pool(min_size=2)
+
+    async with pool:
+        assert pool.stats().idle == 2
+        connection = await pool.acquire()
+
+    assert pool.closed
+    assert pool.stats().size == 1
+    with pytest.raises(RuntimeError):
+        await pool.acquire()
+
+    await pool.release(connection)
+    assert connection.closed
+    assert pool.stats().size == 0
+
+
+@pytest.mark.asyncio
+async def test_resources_are_discarded_if_an_exception_is_raised():
+    pool = build_pool()
+
+    with pytest.raises(ValueError):
+        async with pool.resource() as connection:
+            raise ValueError
+
+    assert connection.closed
+    assert pool.stats().size == 0
+
+
+def test_pooled_resources_are_provided_to_views():
+    pool = build_pool(name="pooled_db", min_size=2, max_size=2)
+    pool.provide()
+    app = App()
+
+    @app.route("/")
+    async def index(req, res, pooled_db, pooled_db_pool):
+        assert pooled_db_pool is pool
+        res.media = {"pk": pooled_db.pk, "in_use": pool.stats().in_use}
+
+    client = create_client(app)
+
+    with client:
+        assert pool.stats().idle == 2
+        assert client.get("/").json() == {"pk": 1, "in_use": 1}
+        assert client.get("/").json() == {"pk": 1, "in_use": 1}
+        assert pool.stats().in_use == 0
+
+    assert pool.closed
+    assert pool.stats().size == 0
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from bocadillo import App, HTTPError
+from bocadillo.executors import ExecutorBusy, ProcessPool
+from bocadillo.testing import create_client
+
+
+def get_pid() -> int:
+    return os.getpid()
+
+
+def fibonacci(n: int) -> int:
+    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+
+def echo(value):
+    return value
+
+
+def test_run_in_process():
+    app = App(process_pool={"max_workers": 1})
+
+    @app.route("/fib/{n}")
+    async def fib(req, res, n: int):
+        res.media = {
+            "value": await app.process_pool.run(fibonacci, n),
+            "pid": await app.process_pool.run(get_pid),
+        }
+
+    with create_client(app) as client:
+        json = client.get("/fib/10").json()
+        assert json["value"] == 55
+        assert json["pid"] != os.getpid()
+        assert app.process_pool._pool is not None
+
+    assert app.process_pool._pool is None
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_use_shared_memory():
+    pool = ProcessPool(max_workers=1, shm_threshold=1024)
+    try:
+        data = os.urandom(64 * 1024)
+        assert await pool.run(echo, data) == data
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_unpicklable_arguments():
+    pool = ProcessPool(max_workers=1)
+    with pytest.raises(TypeError) as ctx:
+        await pool.run(echo, threading.Lock())
+    assert "picklable" in str(ctx.value)
+    assert pool.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_timeout():
+    pool = ProcessPool(max_workers=1, timeout=0.01)
+    try:
+        with pytest.raises(HTTPError) as ctx:
+            await pool.run(fibonacci, 27)
+        assert ctx.value.status_code == 503
+    finally:
+        pool.shutdown()
+    await asyncio.sleep(0.01)
+    assert pool.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_limit():
+    pool = ProcessPool(max_workers=1, queue_size=0, timeout=0.01)
+    try:
+        with pytest.raises(HTTPError):
+            await pool.run(fibonacci, 27)
+        # The first call is still running.
+        assert pool.pending == 1
+        with pytest.raises(ExecutorBusy):
+            await pool.run(fibonacci, 1)
+    finally:
+        pool.shutdown()
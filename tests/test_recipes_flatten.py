@@ -0,0 +1,182 @@
+import pytest
+
+from bocadillo import App, Middleware, Recipe
+from bocadillo.recipes import RecipeRoute
+from bocadillo.testing import create_client
+
+
+@pytest.fixture(name="tacos")
+def fixture_tacos():
+    tacos = Recipe("tacos")
+
+    @tacos.route("/{ingredient}")
+    async def retrieve_taco(req, res, ingredient: str):
+        res.media = {"ingredient": ingredient}
+
+    return tacos
+
+
+def test_routes_are_registered_on_the_app(tacos: Recipe):
+    app = App()
+    app.recipe(tacos, flatten=True)
+
+    route = app.http_router.routes["tacos:retrieve_taco"]
+    assert isinstance(route, RecipeRoute)
+    assert route.pattern == "/tacos/{ingredient}"
+    assert app._mounts.get("/tacos") is None
+
+    response = create_client(app).get("/tacos/beef")
+    assert response.status_code == 200
+    assert response.json() == {"ingredient": "beef"}
+
+
+def test_url_for(tacos: Recipe):
+    app = App()
+    app.recipe(tacos, flatten=True)
+    assert app.url_for("tacos:retrieve_taco", ingredient="fish") == (
+        "/tacos/fish"
+    )
+
+
+def test_redirect():
+    app = App()
+    numbers = Recipe("numbers")
+
+    @numbers.route("/R")
+    async def R(req, res):
+        numbers.redirect(name="numbers:real")
+
+    @numbers.route("/real")
+    async def real(req, res):
+        res.text = "inf"
+
+    app.recipe(numbers, flatten=True)
+
+    response = create_client(app).get("/numbers/R")
+    assert response.status_code == 200
+    assert response.text == "inf"
+
+
+def test_recipe_error_handlers_only_apply_to_recipe_routes():
+    app = App()
+    tacos = Recipe("tacos")
+
+    @tacos.route("/oops")
+    async def oops(req, res):
+        raise KeyError
+
+    @app.route("/oops")
+    async def app_oops(req, res):
+        raise KeyError
+
+    @tacos.error_handler(KeyError)
+    async def handle(req, res, exc):
+        res.status_code = 418
+
+    app.recipe(tacos, flatten=True)
+    client = create_client(app, raise_server_exceptions=False)
+
+    assert client.get("/tacos/oops").status_code == 418
+    assert client.get("/oops").status_code == 500
+
+
+def test_recipe_middleware_only_applies_to_recipe_routes(tacos: Recipe):
+    app = App()
+    calls = []
+
+    class Tracker(Middleware):
+        async def before_dispatch(self, req, res):
+            calls.append((self.app, self.kwargs["tag"], req.url.path))
+
+    tacos.add_middleware(Tracker, tag="tacos")
+
+    @app.route("/")
+    async def index(req, res):
+        pass
+
+    app.recipe(tacos, flatten=True)
+    client = create_client(app)
+
+    assert client.get("/").status_code == 200
+    assert calls == []
+    assert client.get("/tacos/beef").status_code == 200
+    assert calls == [(tacos, "tacos", "/tacos/beef")]
+
+
+def test_middleware_can_return_a_response(tacos: Recipe):
+    app = App()
+
+    class Block(Middleware):
+        async def before_dispatch(self, req, res):
+            res.status_code = 403
+            res.text = "Blocked"
+            return res
+
+    tacos.add_middleware(Block)
+    app.recipe(tacos, flatten=True)
+
+    response = create_client(app).get("/tacos/beef")
+    assert response.status_code == 403
+    assert response.text == "Blocked"
+
+
+def test_websocket_routes_are_registered_on_the_app():
+    app = App()
+    chat = Recipe("chat")
+
+    @chat.websocket_route("/{room}")
+    async def room(ws, room):
+        await ws.send(room)
+
+    app.recipe(chat, flatten=True)
+
+    with create_client(app).websocket_connect("/chat/general") as ws:
+        assert ws.receive_text() == "general"
+
+
+def test_flatten_recipe_book():
+    app = App()
+    interns = Recipe("interns")
+
+    @interns.route("/{pk}")
+    async def get_intern(req, res, pk: int):
+        res.media = {"id": pk}
+
+    people = Recipe.book(interns, prefix="/people")
+    entities = Recipe.book(people, prefix="/entities")
+    app.recipe(entities, flatten=True)
+
+    assert app.url_for("interns:get_intern", pk=1) == (
+        "/entities/people/interns/1"
+    )
+    response = create_client(app).get("/entities/people/interns/1")
+    assert response.status_code == 200
+    assert response.json() == {"id": 1}
+
+
+def test_scoped_middleware_of_flattened_recipe():
+    app = App()
+    tacos = Recipe("tacos")
+
+    class Block(Middleware):
+        async def before_dispatch(self, req, res):
+            res.status_code = 403
+            res.text = "Blocked"
+            return res
+
+    @tacos.route("/public")
+    async def public(req, res):
+        res.text = "Public"
+
+    @tacos.route("/private")
+    async def private(req, res):
+        res.text = "Private"
+
+    tacos.add_middleware(Block, only={"private"})
+    app.recipe(tacos, flatten=True)
+
+    client = create_client(app)
+    assert client.get("/tacos/public").text == "Public"
+    response = client.get("/tacos/private")
+    assert response.status_code == 403
+    assert response.text == "Blocked"
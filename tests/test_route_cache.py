@@ -0,0 +1,84 @@
+import pytest
+
+from bocadillo import App
+from bocadillo.routing import HTTPRouter, RouteCache
+
+
+@pytest.fixture(name="router")
+def fixture_router():
+    router = HTTPRouter(cache_size=2)
+
+    @router.route("/items/{pk}")
+    async def item(req, res, pk):
+        pass
+
+    return router
+
+
+def test_cache_is_disabled_by_default():
+    assert HTTPRouter().cache is None
+
+
+def test_matches_are_cached(router: HTTPRouter):
+    first = router.match("/items/1")
+    assert router.match("/items/1") is first
+    assert first.params == {"pk": "1"}
+
+    info = router.cache.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    assert router.fallbacks == 1
+
+
+def test_misses_are_cached(router: HTTPRouter):
+    assert router.match("/junk") is None
+    assert router.match("/junk") is None
+    assert router.cache.info().hits == 1
+    assert router.fallbacks == 1
+
+
+def test_least_recently_used_entry_is_evicted(router: HTTPRouter):
+    router.match("/items/1")
+    router.match("/items/2")
+    router.match("/items/1")
+    router.match("/items/3")  # evicts "/items/2"
+
+    info = router.cache.info()
+    assert (info.evictions, info.currsize) == (1, 2)
+
+    router.match("/items/1")
+    assert router.cache.info().hits == 2
+    router.match("/items/2")
+    assert router.cache.info().misses == 4
+
+
+def test_adding_route_invalidates_cache(router: HTTPRouter):
+    assert router.match("/other") is None
+
+    @router.route("/other")
+    async def other(req, res):
+        pass
+
+    assert router.match("/other") is not None
+
+
+def test_app_route_cache_size():
+    app = App(route_cache_size=10)
+    assert isinstance(app.http_router.cache, RouteCache)
+    assert app.http_router.cache.maxsize == 10
+
+
+def test_mount_invalidates_cache():
+    app = App(route_cache_size=10)
+    app.http_router.match("/foo")
+    assert app.http_router.cache.info().currsize == 1
+
+    app.mount("/other", App())
+    assert app.http_router.cache.info().currsize == 0
+
+
+def test_cache_hits_are_not_counted_as_fallbacks(router: HTTPRouter):
+    router.match("/items/1")
+    router.match("/items/1")
+    assert router.fallbacks == 1
+    assert router.static_hits == 0
+    assert router.cache.hits == 1
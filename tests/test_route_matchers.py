@@ -0,0 +1,202 @@
+from datetime import date
+
+import pytest
+
+from bocadillo import App
+from bocadillo.matchers import RegexMatcher, ScanMatcher, TreeMatcher
+from bocadillo.routing import HTTPRoute, HTTPRouter
+
+PATTERNS = [
+    "/",
+    "/about",
+    "/users/{pk}",
+    "/users/me",
+    "/users/{pk}/posts/{slug}",
+    "/users/{user_id}/posts",
+    "/files/{}",
+    "/files/static.css",
+    "/foo/{}-bar",
+    "/a.b",
+    "/trailing/",
+    "/{page}",
+]
+
+PATHS = [
+    "",
+    "/",
+    "/about",
+    "/users/",
+    "/users/1",
+    "/users/me",
+    "/users/1/posts",
+    "/users/1/posts/",
+    "/users/1/posts/hello",
+    "/users//posts",
+    "/files/",
+    "/files/static.css",
+    "/files/js/app.js",
+    "/foo/no-bar",
+    "/foo/-bar",
+    "/axb",
+    "/trailing",
+    "/trailing/",
+    "/unknown/path/that/is/deep",
+    "/about\n",
+    "/users/1\n",
+    "/files/a\n",
+    "/files/a\nb",
+    "/foo/no-bar\n",
+]
+
+
+def build_routes(patterns):
+    async def view(req, res):
+        pass
+
+    return [
+        HTTPRoute.create(view, pattern=pattern, name=str(index))
+        for index, pattern in enumerate(patterns)
+    ]
+
+
+def describe(found):
+    if found is None:
+        return None
+    route, params = found
+    return route.pattern, params
+
+
+@pytest.mark.parametrize("matcher_class", [TreeMatcher, RegexMatcher])
+@pytest.mark.parametrize(
+    "patterns",
+    [PATTERNS, PATTERNS[::-1], ["{}"] + PATTERNS, ["/{}", "/a-{x}"]],
+)
+@pytest.mark.parametrize("path", PATHS + ["/a-1", "/a-1\n"])
+def test_matcher_behaves_like_scan_matcher(matcher_class, patterns, path):
+    routes = build_routes(patterns)
+    expected = describe(ScanMatcher(routes).match(path))
+    assert describe(matcher_class(routes).match(path)) == expected
+
+
+def build_typed_routes():
+    async def by_pk(req, res, pk: int):
+        pass
+
+    async def by_slug(req, res, slug):
+        pass
+
+    async def by_day(req, res, pk: int, day: date):
+        pass
+
+    async def by_flag(req, res, flag: bool):
+        pass
+
+    return [
+        HTTPRoute.create(by_pk, pattern="/items/{pk}", name="by_pk"),
+        HTTPRoute.create(by_slug, pattern="/items/{slug}", name="by_slug"),
+        HTTPRoute.create(by_day, pattern="/items/{pk}/{day}", name="by_day"),
+        HTTPRoute.create(by_flag, pattern="/flags/{flag}-on", name="by_flag"),
+    ]
+
+
+@pytest.mark.parametrize("matcher_class", [TreeMatcher, RegexMatcher])
+@pytest.mark.parametrize(
+    "path, pattern",
+    [
+        ("/items/42", "/items/{pk}"),
+        ("/items/-4.2", "/items/{pk}"),
+        ("/items/abc", "/items/{slug}"),
+        ("/items/42/2019-01-02", "/items/{pk}/{day}"),
+        ("/items/42/today", None),
+        ("/items/abc/2019-01-02", None),
+        ("/flags/TRUE-on", "/flags/{flag}-on"),
+        ("/flags/yes-on", None),
+    ],
+)
+def test_typed_route_parameters(matcher_class, path, pattern):
+    routes = build_typed_routes()
+    expected = describe(ScanMatcher(routes).match(path))
+    found = describe(matcher_class(routes).match(path))
+    assert found == expected
+    assert (found and found[0]) == pattern
+
+
+@pytest.mark.parametrize("matcher_class", [TreeMatcher, RegexMatcher])
+def test_first_registered_route_wins(matcher_class):
+    routes = build_routes(["/{name}", "/about"])
+    route, params = matcher_class(routes).match("/about")
+    assert route.pattern == "/{name}"
+    assert params == {"name": "about"}
+
+
+def test_router_rebuilds_matcher_when_route_added():
+    router = HTTPRouter()
+    first, second = build_routes(["/a", "/b"])
+
+    router.add_route(first)
+    assert router.match("/b") is None
+
+    router.add_route(second)
+    match = router.match("/b")
+    assert match is not None
+    assert match.route is second
+
+
+def test_static_routes_are_matched_without_matcher():
+    router = HTTPRouter()
+    for route in build_routes(["/health", "/users/{pk}"]):
+        router.add_route(route)
+
+    assert router.match("/health").route.pattern == "/health"
+    assert router.match("/users/1").params == {"pk": "1"}
+    assert router.match("/nope") is None
+    assert router.static_hits == 1
+    assert router.fallbacks == 2
+
+
+def test_static_route_registered_after_matching_dynamic_route():
+    router = HTTPRouter()
+    for route in build_routes(["/{page}", "/about"]):
+        router.add_route(route)
+
+    match = router.match("/about")
+    assert match.route.pattern == "/{page}"
+    assert match.params == {"page": "about"}
+    assert router.static_hits == 1
+
+
+def test_no_routes_means_no_match():
+    assert RegexMatcher([]).match("/") is None
+
+
+def test_use_matcher_class_on_app():
+    app = App(matcher_class=RegexMatcher)
+    assert app.http_router.matcher_class is RegexMatcher
+    assert app.websocket_router.matcher_class is RegexMatcher
+
+    @app.route("/items/{pk}")
+    async def item(req, res, pk):
+        pass
+
+    match = app.http_router.match("/items/1")
+    assert match.params == {"pk": "1"}
+
+
+@pytest.mark.parametrize(
+    "matcher_class", [ScanMatcher, TreeMatcher, RegexMatcher]
+)
+def test_trailing_newline_does_not_match(matcher_class):
+    routes = build_routes(["/about", "/files/{}", "/users/{pk}"])
+    matcher = matcher_class(routes)
+    assert matcher.match("/about\n") is None
+    assert matcher.match("/files/a\n") is None
+
+
+def test_static_table_does_not_match_trailing_newline():
+    router = HTTPRouter()
+    for route in build_routes(["/about"]):
+        router.add_route(route)
+
+    assert router.match("/about\n") is None
+    assert router.static_hits == 0
+    assert router.fallbacks == 1
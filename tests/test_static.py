@@ -85,5 +85,5 @@ def test_if_static_dir_does_not_exist_then_no_files_mounted():
 
 def test_whitenoise_config():
     app = App(static_root="static", static_config={"max_age": 30})
-    whitenoise = app._prefix_to_app["/static"]
+    whitenoise = app._mounts.get("/static").app
     assert whitenoise.max_age == 30